@@ -0,0 +1,259 @@
+# API接口文档: https://info.arxiv.org/help/api/user-manual.html
+import io
+import re
+import time
+import asyncio
+import threading
+import datetime
+import http_client
+import async_http
+import diagnostics
+import xml.etree.ElementTree as ET
+
+from arxiv_id import parse_arxiv_id
+
+API_URL = "https://export.arxiv.org/api/query"
+
+ATOM_NS = {
+    "atom": "http://www.w3.org/2005/Atom",
+    "arxiv": "http://arxiv.org/schemas/atom",
+    "opensearch": "http://a9.com/-/spec/opensearch/1.1/",
+}
+
+ENTRY_TAG = f"{{{ATOM_NS['atom']}}}entry"
+TOTAL_RESULTS_TAG = f"{{{ATOM_NS['opensearch']}}}totalResults"
+
+MONTHS = ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
+
+# arXiv API要求两次请求之间至少间隔3秒
+API_REQUEST_INTERVAL = 3.0
+
+# 单次请求返回的最大条目数(API上限为2000)
+MAX_RESULTS_PER_REQUEST = 1000
+
+_api_slot_lock = threading.Lock()
+_next_api_slot = 0.0
+
+
+def reserve_api_slot():
+    """预约下一次API请求的时间, 返回需要等待的秒数.
+    所有线程和协程共用同一个间隔, 多个类别并发获取时请求依次错开, 下载和解析仍可重叠"""
+    global _next_api_slot
+    with _api_slot_lock:
+        now = time.monotonic()
+        slot = max(now, _next_api_slot)
+        _next_api_slot = slot + API_REQUEST_INTERVAL
+    return slot - now
+
+
+def format_api_date(iso_date):
+    """将 2017-06-12T17:57:34Z 转换为详情页使用的 12 Jun 2017 格式"""
+    match = re.match(r'(\d{4})-(\d{2})-(\d{2})', iso_date or "")
+    if not match:
+        return "未知日期"
+    year, month, day = match.groups()
+    return f"{int(day)} {MONTHS[int(month) - 1]} {year}"
+
+
+def _clean(text):
+    return re.sub(r'\s+', ' ', text or "").strip()
+
+
+def parse_atom_entry(entry):
+    """将一个Atom <entry> 解析为与详情页相同结构的字典"""
+    arxiv_id, version = parse_arxiv_id(entry.findtext("atom:id", "", ATOM_NS))
+
+    authors = [_clean(author.findtext("atom:name", "", ATOM_NS))
+               for author in entry.findall("atom:author", ATOM_NS)]
+
+    pdf_url = ""
+    for link in entry.findall("atom:link", ATOM_NS):
+        if link.get("title") == "pdf":
+            pdf_url = link.get("href", "").replace("http://", "https://", 1)
+            break
+
+    subjects = [category.get("term") for category in entry.findall("atom:category", ATOM_NS)
+                if category.get("term")]
+
+    return {
+        'id': arxiv_id,
+        'version': version,
+        'comments': _clean(entry.findtext("arxiv:comment", "", ATOM_NS)),
+        'details': {
+            'Title': _clean(entry.findtext("atom:title", "", ATOM_NS)) or "未找到标题",
+            'Authors': ", ".join(authors) if authors else "未找到作者",
+            'Abstract': _clean(entry.findtext("atom:summary", "", ATOM_NS)) or "未找到摘要",
+            'Date': format_api_date(entry.findtext("atom:updated", "", ATOM_NS)),
+            'PDF': pdf_url,
+            'Subjects': subjects
+        }
+    }
+
+
+# 增量解析时每次读取的字节数
+PARSE_CHUNK_SIZE = 64 * 1024
+
+
+class AtomStreamParser:
+    """增量解析Atom响应: feed() 传入一段数据, 返回其中已经完整的 <entry> 的解析结果并释放这些元素,
+    内存占用与条目数无关. 传入 feed_info 字典时写入 total (opensearch:totalResults)"""
+
+    def __init__(self, feed_info=None):
+        self.feed_info = feed_info
+        self._parser = ET.XMLPullParser(events=("start", "end"))
+        self._root = None
+
+    def feed(self, data):
+        self._parser.feed(data)
+        return self._read_entries()
+
+    def close(self):
+        self._parser.close()
+        return self._read_entries()
+
+    def _read_entries(self):
+        entries = []
+        for event, elem in self._parser.read_events():
+            if event == "start":
+                if self._root is None:
+                    self._root = elem
+                continue
+            if elem.tag == ENTRY_TAG:
+                entries.append(parse_atom_entry(elem))
+                self._root.clear()
+            elif elem.tag == TOTAL_RESULTS_TAG and self.feed_info is not None:
+                self.feed_info['total'] = int(elem.text or 0)
+        return entries
+
+
+def iter_atom_entries(stream, feed_info=None):
+    """从文件对象增量解析Atom响应, 每解析完一个 <entry> 立即产出"""
+    parser = AtomStreamParser(feed_info)
+    while True:
+        data = stream.read(PARSE_CHUNK_SIZE)
+        if not data:
+            break
+        yield from parser.feed(data)
+    yield from parser.close()
+
+
+def parse_atom_feed(xml_text, feed_info=None):
+    if isinstance(xml_text, str):
+        xml_text = xml_text.encode("utf-8")
+    return list(iter_atom_entries(io.BytesIO(xml_text), feed_info))
+
+
+def fetch_details_by_ids(arxiv_ids, batch_size=100, timeout=None):
+    """通过 id_list 批量获取论文详情, 返回 {arXiv编号: 解析结果}"""
+    results = {}
+    arxiv_ids = list(dict.fromkeys(arxiv_ids))
+
+    for start in range(0, len(arxiv_ids), batch_size):
+        batch = arxiv_ids[start:start + batch_size]
+        params = {
+            "id_list": ",".join(batch),
+            "max_results": len(batch)
+        }
+        for entry in _iter_query(params, timeout=timeout):
+            if entry['id']:
+                results[entry['id']] = entry
+
+    return results
+
+
+def _iter_query(params, timeout=None, feed_info=None):
+    time.sleep(reserve_api_slot())
+    response = http_client.get(API_URL, params=params, timeout=timeout, stream=True)
+    try:
+        response.raise_for_status()
+        reader = http_client.open_stream(response)
+        entries = iter_atom_entries(reader, feed_info)
+        while True:
+            # 解析与下载交替进行, 解析耗时中扣除等待网络数据的时间
+            start = time.perf_counter()
+            read_time = reader.read_time
+            entry = next(entries, None)
+            diagnostics.record("parse", time.perf_counter() - start - (reader.read_time - read_time))
+            if entry is None:
+                break
+            yield entry
+    finally:
+        response.close()
+
+
+def category_query(category, start_date, end_date):
+    """按类别和提交日期范围构造 search_query; 不带子类的类别(如 math)匹配其下所有子类"""
+    if "." not in category and category != "physics":
+        category = f"{category}.*"
+    return (f"cat:{category} AND "
+            f"submittedDate:[{start_date:%Y%m%d}0000 TO {end_date:%Y%m%d}2359]")
+
+
+def recent_category_query(category, days=3, end_date=None):
+    end_date = end_date or datetime.datetime.now(datetime.timezone.utc).date()
+    start_date = end_date - datetime.timedelta(days=days - 1)
+    return category_query(category, start_date, end_date)
+
+
+def category_params(query, start, max_results):
+    return {
+        "search_query": query,
+        "sortBy": "submittedDate",
+        "sortOrder": "descending",
+        "start": start,
+        "max_results": min(MAX_RESULTS_PER_REQUEST, max_results - start),
+    }
+
+
+def iter_category_entries(category, days=3, end_date=None, max_results=2000, timeout=None, feed_info=None):
+    """流式获取一个类别在最近 days 天内提交的论文, 按提交时间倒序逐条产出解析结果.
+    一次请求最多返回 MAX_RESULTS_PER_REQUEST 条, 超出时翻页并遵守请求间隔"""
+    feed_info = {} if feed_info is None else feed_info
+    query = recent_category_query(category, days, end_date)
+
+    start = 0
+    while start < max_results:
+        params = category_params(query, start, max_results)
+        count = 0
+        for entry in _iter_query(params, timeout=timeout, feed_info=feed_info):
+            count += 1
+            yield entry
+        start += count
+        if count == 0 or start >= feed_info.get('total', 0):
+            break
+
+
+async def fetch_category_entries_async(category, days=3, end_date=None, max_results=2000, timeout=None,
+                                      page_callback=None):
+    """异步版 iter_category_entries, 返回全部解析结果. 响应体边下载边增量解析, 不在内存中保留整个响应;
+    每收到一段数据并解析出新条目后调用 page_callback(新条目)"""
+    query = recent_category_query(category, days, end_date)
+    entries = []
+    while len(entries) < max_results:
+        params = category_params(query, len(entries), max_results)
+        await asyncio.sleep(reserve_api_slot())
+        feed_info = {}
+        parser = AtomStreamParser(feed_info)
+        count = 0
+        response = await async_http.get(API_URL, params=params, timeout=timeout, stream=True)
+        try:
+            response.raise_for_status()
+            async for data in async_http.aiter_bytes(response):
+                with diagnostics.stage("parse"):
+                    page = parser.feed(data)
+                count += _add_page(entries, page, page_callback)
+            with diagnostics.stage("parse"):
+                page = parser.close()
+            count += _add_page(entries, page, page_callback)
+        finally:
+            await response.aclose()
+        if count == 0 or len(entries) >= feed_info.get('total', 0):
+            break
+    return entries
+
+
+def _add_page(entries, page, page_callback):
+    entries.extend(page)
+    if page_callback and page:
+        page_callback(page)
+    return len(page)
@@ -0,0 +1,270 @@
+"""arXiv论文每日获取及翻译的命令行入口, 不依赖Qt, 可在无界面的服务器上定时运行
+
+用法示例:
+    python -m arxiv_daily fetch --cat cs.CV --translate zh
+    python -m arxiv_daily fetch --cat cs.CV cs.LG --translate ja --method siliconflow --api-key sk-xxx
+    python -m arxiv_daily sync --cat cs.CV --translate zh
+    python -m arxiv_daily search "diffusion model" "self-supervised" segment*
+"""
+import os
+import sys
+import json
+import argparse
+import datetime
+
+from http_client import REQUEST_ERRORS
+from arxiv_scraper import FetchError, SOURCES, DEFAULT_SOURCE, fetch_category_papers, backfill_details, get_paper_details
+from rate_limit import TokenBucket
+from translation import BatchTranslator
+from translation_engines import configure_hedging, format_engine_stats
+from sync_state import get_sync_state, sync_category
+from search_index import get_search_index
+from local_cache import get_paper_cache
+from dedup import Deduplicator
+
+LANGUAGES = {
+    "zh": "中文",
+    "zh-tw": "中文繁体",
+    "ja": "日文",
+}
+
+METHODS = {
+    "youdao": "有道翻译",
+    "siliconflow": "硅基流动API",
+}
+
+DEFAULT_MODEL = "deepseek-ai/DeepSeek-V3"
+
+
+def log(message):
+    print(f"[{datetime.datetime.now():%H:%M:%S}] {message}", file=sys.stderr)
+
+
+def collect_details(papers, rate=1.0, backfill=True):
+    """批量补全摘要, 剩余未命中的论文逐篇抓取详情页, 返回合并后的论文记录"""
+    if backfill:
+        try:
+            backfill_details(papers)
+        except Exception as e:
+            log(f"批量获取摘要失败, 改为逐篇获取: {e}")
+
+    limiter = TokenBucket(rate, 1)
+    records = []
+    for paper in papers:
+        try:
+            details = get_paper_details(paper['url'], limiter=limiter)
+        except Exception as e:
+            log(f"获取详情失败 {paper['url']}: {e}")
+            details = {}
+        records.append({
+            'id': paper['id'],
+            'url': paper['url'],
+            'title': details.get('Title', paper['title']),
+            'authors': details.get('Authors', paper['authors']),
+            'subjects': details.get('Subjects', paper['subjects']),
+            'comments': paper['comments'],
+            'date': details.get('Date', ""),
+            'pdf': details.get('PDF', ""),
+            'abstract': details.get('Abstract', ""),
+        })
+    return records
+
+
+def write_markdown(path, category, date, records):
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(f"# arXiv {category} {date}\n\n")
+        for i, record in enumerate(records, 1):
+            f.write(f"## {i}. {record['title']}\n\n")
+            f.write(f"- 作者: {record['authors']}\n")
+            f.write(f"- 类别: {', '.join(record['subjects'])}\n")
+            f.write(f"- 链接: {record['url']}\n")
+            if record['pdf']:
+                f.write(f"- PDF: {record['pdf']}\n")
+            f.write(f"\n{record['abstract']}\n\n")
+            if record.get('translation'):
+                f.write(f"{record['translation']}\n\n")
+
+
+def write_results(out_dir, category, records, suffix=""):
+    os.makedirs(out_dir, exist_ok=True)
+    date = datetime.date.today().isoformat()
+    basename = f"{category}_{date}{suffix}"
+
+    json_path = os.path.join(out_dir, f"{basename}.json")
+    with open(json_path, 'w', encoding='utf-8') as f:
+        json.dump(records, f, ensure_ascii=False, indent=2)
+
+    md_path = os.path.join(out_dir, f"{basename}.md")
+    write_markdown(md_path, category, date, records)
+    return json_path, md_path
+
+
+def translate_records(records, args):
+    target_lang = LANGUAGES[args.translate]
+    method = METHODS[args.method]
+    api_key = None
+    model_id = None
+    if method == "硅基流动API":
+        api_key = args.api_key or os.environ.get("SILICONFLOW_API_KEY")
+        model_id = args.model
+        if not api_key:
+            log("使用硅基流动API需要提供 --api-key 或环境变量 SILICONFLOW_API_KEY")
+            return False
+
+    if args.hedge:
+        configure_hedging(enabled=True, percentile=args.hedge)
+
+    translator = BatchTranslator(
+        records, target_lang, method,
+        api_key=api_key, model_id=model_id, max_workers=args.workers
+    )
+    results = translator.run()
+    for record in records:
+        record['translation'] = results.get(record['url'], "")
+    log(f"翻译完成: 成功 {translator.succeeded} 篇, 失败 {translator.done - translator.succeeded} 篇")
+    if args.hedge:
+        log(format_engine_stats())
+    return True
+
+
+# 单个类别获取失败(包括DNS解析失败、连接被拒绝、读取超时等网络错误)时记录后继续下一个类别
+CATEGORY_ERRORS = (FetchError,) + REQUEST_ERRORS
+
+
+def cmd_fetch(args):
+    exit_code = 0
+    dedup = None if args.keep_duplicates else Deduplicator()
+    for category in args.cat:
+        log(f"正在获取 {category} 类别的论文...")
+        try:
+            papers = fetch_category_papers(category, source=args.source, max_results=args.show)
+            ok = process_papers(category, papers, args, dedup=dedup)
+        except CATEGORY_ERRORS as e:
+            log(f"{category}: {e}")
+            exit_code = 1
+            continue
+
+        if not ok:
+            exit_code = 1
+    return exit_code
+
+
+def cmd_sync(args):
+    exit_code = 0
+    dedup = None if args.keep_duplicates else Deduplicator()
+    for category in args.cat:
+        if args.reset:
+            get_sync_state().reset(category)
+        log(f"正在增量同步 {category} 类别...")
+        try:
+            papers = sync_category(category, page_size=args.page_size, check_revisions=args.check_revisions)
+            if not papers:
+                log(f"{category}: 没有新论文")
+                continue
+            revised = sum(1 for paper in papers if paper.get('revised'))
+            log(f"{category}: 新论文 {len(papers) - revised} 篇, 有新版本的论文 {revised} 篇")
+            # sync_category 已批量补全过摘要
+            ok = process_papers(category, papers, args, suffix=f"_{datetime.datetime.now():%H%M%S}",
+                                backfill=False, dedup=dedup)
+        except CATEGORY_ERRORS as e:
+            log(f"{category}: {e}")
+            exit_code = 1
+            continue
+
+        if not ok:
+            exit_code = 1
+    return exit_code
+
+
+def cmd_search(args):
+    # 打开详情缓存时会导入建立索引之前已缓存的论文
+    get_paper_cache()
+    papers = get_search_index().search(" ".join(args.query), limit=args.limit)
+    for i, paper in enumerate(papers, 1):
+        print(f"{i}. {paper['title']}")
+        print(f"   {paper['authors']}")
+        print(f"   {paper['url']}  {', '.join(paper['subjects'])}")
+    log(f"共找到 {len(papers)} 篇论文")
+    return 0
+
+
+def process_papers(category, papers, args, suffix="", backfill=True, dedup=None):
+    """补全详情、按需翻译并写入结果文件, 翻译配置有误时返回False.
+    传入 dedup 时跳过之前的类别中已处理过的论文, 每篇论文只获取详情和翻译一次"""
+    if dedup is not None:
+        # 交叉列出的论文编号相同, 获取详情前即可排除
+        count = len(papers)
+        papers = [paper for paper in papers if not dedup.is_known(paper)]
+        if count > len(papers):
+            log(f"{category}: 跳过 {count - len(papers)} 篇已在其他类别中获取的论文")
+
+    records = collect_details(papers, backfill=backfill)
+    for record, paper in zip(records, papers):
+        if paper.get('revised'):
+            record['revised'] = True
+
+    if dedup is not None:
+        # 编号不同但标题和摘要几乎相同的论文
+        count = len(records)
+        records = dedup.unique(records)
+        if count > len(records):
+            log(f"{category}: 合并 {count - len(records)} 篇内容重复的论文")
+    log(f"{category}: 共获取 {len(records)} 篇论文")
+
+    ok = True
+    if args.translate and not translate_records(records, args):
+        ok = False
+
+    json_path, md_path = write_results(args.out, category, records, suffix=suffix)
+    log(f"已写入 {json_path} 和 {md_path}")
+    return ok
+
+
+def add_translation_arguments(parser):
+    parser.add_argument("--cat", nargs="+", default=["cs.CV"], help="arXiv类别, 如 cs.CV cs.LG")
+    parser.add_argument("--translate", choices=sorted(LANGUAGES), help="将摘要翻译成指定语言")
+    parser.add_argument("--method", choices=sorted(METHODS), default="youdao", help="翻译方式")
+    parser.add_argument("--api-key", help="硅基流动API密钥, 也可通过环境变量 SILICONFLOW_API_KEY 提供")
+    parser.add_argument("--model", default=DEFAULT_MODEL, help="硅基流动模型ID")
+    parser.add_argument("--workers", type=int, default=4, help="批量翻译并发数")
+    parser.add_argument("--hedge", type=int, metavar="P",
+                        help="开启对冲请求: 单篇翻译耗时超过第P百分位延迟时同时请求另一翻译引擎")
+    parser.add_argument("--out", default="arxiv_output", help="结果输出目录")
+    parser.add_argument("--keep-duplicates", action="store_true",
+                        help="不去重: 交叉列出的论文在每个类别的结果中都保留")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="arxiv_daily", description="arXiv论文每日获取及翻译(命令行版)")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    fetch_parser = subparsers.add_parser("fetch", help="获取指定类别最近提交的论文")
+    add_translation_arguments(fetch_parser)
+    fetch_parser.add_argument("--show", type=int, default=100, help="每个类别最多获取的论文数量")
+    fetch_parser.add_argument("--source", choices=sorted(SOURCES), default=DEFAULT_SOURCE,
+                              help="论文列表数据源: html 为网页抓取(默认, 与 /recent 列表一致), "
+                                   "api 为arXiv API(按最近3天的提交时间筛选)")
+    fetch_parser.set_defaults(func=cmd_fetch)
+
+    sync_parser = subparsers.add_parser("sync", help="增量同步: 只获取上次同步以来新出现的论文")
+    add_translation_arguments(sync_parser)
+    sync_parser.add_argument("--page-size", type=int, default=500, help="每次翻页获取的论文数量")
+    sync_parser.add_argument("--check-revisions", action="store_true", help="同时检查已见论文是否有新版本")
+    sync_parser.add_argument("--reset", action="store_true", help="清除该类别的同步记录后重新同步")
+    sync_parser.set_defaults(func=cmd_sync)
+
+    search_parser = subparsers.add_parser("search", help="在以往获取过的所有论文中全文检索")
+    search_parser.add_argument("query", nargs="+", help='检索词, 支持"短语"和前缀匹配(如 diffus*)')
+    search_parser.add_argument("--limit", type=int, default=20, help="最多显示的结果数量")
+    search_parser.set_defaults(func=cmd_search)
+
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
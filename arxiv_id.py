@@ -0,0 +1,19 @@
+import re
+
+# 新式编号 2510.12345v2, 旧式编号 math/0501001v1 或 hep-th/9901001
+ARXIV_ID_PATTERN = re.compile(
+    r'(?:arxiv\.org/(?:abs|pdf)/|^|arXiv:)'
+    r'(\d{4}\.\d{4,5}|[a-z\-]+(?:\.[A-Z]{2})?/\d{7})'
+    r'(v\d+)?',
+    re.IGNORECASE
+)
+
+
+def parse_arxiv_id(url_or_id):
+    """从arXiv链接或编号中解析出 (编号, 版本), 无版本号时版本为空字符串"""
+    if not url_or_id:
+        return None, ""
+    match = ARXIV_ID_PATTERN.search(url_or_id.strip())
+    if not match:
+        return None, ""
+    return match.group(1), (match.group(2) or "").lower()
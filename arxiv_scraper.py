@@ -0,0 +1,490 @@
+import os
+import re
+import time
+import http_client
+import async_http
+import diagnostics
+from bs4 import BeautifulSoup, SoupStrainer
+
+from arxiv_api import fetch_details_by_ids, iter_category_entries, fetch_category_entries_async
+from arxiv_id import parse_arxiv_id
+from local_cache import get_paper_cache
+from rate_limit import arxiv_page_limiter
+
+LIST_URL = "https://arxiv.org/list/{category}/recent?skip={skip}&show={show}"
+
+HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+}
+
+
+# 可用的HTML解析后端, 按速度从快到慢排列:
+# lxml 直接使用 lxml.html + XPath (可选依赖), html.parser 使用 BeautifulSoup 内置解析器
+PARSER_BACKENDS = ("lxml", "html.parser")
+
+# BeautifulSoup 只构建页面中需要的区域: 列表页的 dl#articles, 详情页的 div#abs-outer
+LIST_STRAINER = SoupStrainer('dl', id='articles')
+DETAILS_STRAINER = SoupStrainer('div', id='abs-outer')
+
+# 列表页每篇论文需要提取的字段: (字段名, div的class, 前缀标签)
+LIST_FIELDS = (
+    ('title', 'list-title', 'Title:'),
+    ('authors', 'list-authors', 'Authors:'),
+    ('comments', 'list-comments', 'Comments:'),
+    ('subjects', 'list-subjects', 'Subjects:'),
+)
+
+
+def detect_parser_backend():
+    preferred = os.environ.get("ARXIV_DAILY_HTML_PARSER")
+    if preferred in PARSER_BACKENDS:
+        return preferred
+    try:
+        import lxml.html  # noqa: F401
+        return "lxml"
+    except ImportError:
+        return "html.parser"
+
+
+parser_backend = detect_parser_backend()
+
+
+def set_parser_backend(name):
+    global parser_backend
+    if name not in PARSER_BACKENDS:
+        raise ValueError(f"不支持的HTML解析器: {name}")
+    parser_backend = name
+
+
+def make_soup(html, strainer=None):
+    return BeautifulSoup(html, 'html.parser', parse_only=strainer)
+
+
+def _has_class(class_name):
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {class_name} ')"
+
+
+def _lxml_root(html):
+    from lxml import html as lxml_html
+    try:
+        return lxml_html.fromstring(html)
+    except ValueError:
+        # 带有XML编码声明的字符串需要以字节形式解析
+        return lxml_html.fromstring(html.encode('utf-8'))
+
+
+def _lxml_list_entries(html):
+    root = _lxml_root(html)
+    # 只遍历 dl#articles 区域, 旧版页面没有该区域时遍历整个页面
+    containers = root.xpath("//dl[@id='articles']") or [root]
+    entries = []
+    for container in containers:
+        for dt in container.iter('dt'):
+            links = dt.xpath(".//a[@title='Abstract']")
+            if not links:
+                entries.append(None)
+                continue
+
+            dd = dt.getnext()
+            while dd is not None and dd.tag != 'dd':
+                dd = dd.getnext()
+
+            fields = {}
+            if dd is not None:
+                for div in dd.iter('div'):
+                    classes = (div.get('class') or '').split()
+                    for key, class_name, label in LIST_FIELDS:
+                        if class_name in classes and key not in fields:
+                            fields[key] = div.text_content().replace(label, '')
+            entries.append((links[0].get('href'), fields))
+    return entries
+
+
+def _soup_list_entries(html):
+    dt_tags = make_soup(html, LIST_STRAINER).find_all('dt')
+    if not dt_tags:
+        # 旧版列表页没有 dl#articles, 退回解析整个页面
+        dt_tags = make_soup(html).find_all('dt')
+
+    entries = []
+    for dt in dt_tags:
+        abstract_link = dt.find('a', title="Abstract")
+        if not abstract_link:
+            entries.append(None)
+            continue
+
+        fields = {}
+        next_dd = dt.find_next_sibling('dd')
+        if next_dd:
+            for key, class_name, label in LIST_FIELDS:
+                div = next_dd.find('div', class_=class_name)
+                if div:
+                    fields[key] = div.text.replace(label, '')
+        entries.append((abstract_link.get('href'), fields))
+    return entries
+
+
+def _lxml_details_fields(html):
+    root = _lxml_root(html)
+    title_xpath = f".//h1[{_has_class('title')}]"
+    scope = root
+    for outer in root.xpath("//div[@id='abs-outer']"):
+        if outer.xpath(title_xpath):
+            scope = outer
+
+    def first_text(xpath):
+        found = scope.xpath(xpath)
+        return found[0].text_content() if found else None
+
+    pdf_links = scope.xpath(".//a[.='pdf']")
+    return {
+        'title': first_text(title_xpath),
+        'authors': first_text(f".//div[{_has_class('authors')}]"),
+        'abstract': first_text(f".//blockquote[{_has_class('abstract')}]"),
+        'history': first_text(f".//div[{_has_class('submission-history')}]"),
+        'pdf': pdf_links[0].get('href') if pdf_links else None,
+        'subjects': first_text(f".//td[{_has_class('tablecell')} and {_has_class('subjects')}]"),
+    }
+
+
+def _soup_details_fields(html):
+    soup = make_soup(html, DETAILS_STRAINER)
+    if soup.find('h1', class_='title') is None:
+        # 页面结构与预期不同时退回解析整个页面
+        soup = make_soup(html)
+
+    def find_text(*args, **kwargs):
+        tag = soup.find(*args, **kwargs)
+        return tag.text if tag else None
+
+    pdf_link = soup.find('a', text='pdf')
+    return {
+        'title': find_text('h1', class_='title'),
+        'authors': find_text('div', class_='authors'),
+        'abstract': find_text('blockquote', class_='abstract'),
+        'history': find_text('div', class_='submission-history'),
+        'pdf': pdf_link['href'] if pdf_link else None,
+        'subjects': find_text('td', class_='tablecell subjects'),
+    }
+
+
+class FetchError(Exception):
+    def __init__(self, status_code):
+        super().__init__(f"请求失败，状态码: {status_code}")
+        self.status_code = status_code
+
+
+def parse_paper_list(html, progress_callback=None):
+    """解析arXiv列表页, 返回论文列表; progress_callback(序号, 总数) 用于报告解析进度"""
+    if parser_backend == "lxml":
+        entries = _lxml_list_entries(html)
+    else:
+        entries = _soup_list_entries(html)
+    papers = []
+
+    for i, entry in enumerate(entries):
+        if entry:
+            relative_url, fields = entry
+            full_url = f"https://arxiv.org{relative_url}"
+            arxiv_id, _ = parse_arxiv_id(full_url)
+
+            # 从列表页提取标题、作者、类别和备注（避免后续单独请求）
+            fields = {key: re.sub(r'\s+', ' ', text).strip() for key, text in fields.items()}
+            subjects_text = fields.get('subjects', "")
+
+            papers.append({
+                'title': fields.get('title') or "未找到标题",
+                'url': full_url,
+                'id': arxiv_id,
+                'authors': fields.get('authors', ""),
+                'subjects': [sub.strip() for sub in subjects_text.split(';') if sub.strip()],
+                'comments': fields.get('comments', "")
+            })
+
+        if progress_callback is not None:
+            progress_callback(i, len(entries))
+
+    return papers
+
+
+def parse_total_entries(html):
+    """从列表页的 "Total of N entries" 中解析论文总数, 未找到时返回None"""
+    match = re.search(r'Total of (\d+) entries', html)
+    return int(match.group(1)) if match else None
+
+
+def fetch_list_page(category, skip=0, show=100, progress_callback=None):
+    """获取列表的一页, 返回 (论文列表, 论文总数). 同时获取多个类别时按 arxiv.org 的全局限速依次请求"""
+    url = LIST_URL.format(category=category, skip=skip, show=show)
+    arxiv_page_limiter().acquire()
+    response = http_client.get(url, headers=HEADERS)
+    if response.status_code != 200:
+        raise FetchError(response.status_code)
+    with diagnostics.stage("parse"):
+        papers = parse_paper_list(response.text, progress_callback=progress_callback)
+        total = parse_total_entries(response.text)
+    return papers, total
+
+
+def iter_paper_list_pages(category, page_size=500, max_pages=20, progress_callback=None):
+    """通过 skip 逐页获取列表, 突破单页数量限制; 逐页产出已去重的论文列表"""
+    seen_urls = set()
+    skip = 0
+    for _ in range(max_pages):
+        papers, total = fetch_list_page(category, skip=skip, show=page_size,
+                                        progress_callback=progress_callback)
+        # 翻页期间有新论文提交时列表会整体后移, 需要去重
+        page = [paper for paper in papers if paper['url'] not in seen_urls]
+        seen_urls.update(paper['url'] for paper in page)
+        yield page
+
+        skip += len(papers)
+        if len(papers) < page_size or (total is not None and skip >= total):
+            return
+
+
+def fetch_paper_list(category, show=100):
+    papers, _ = fetch_list_page(category, skip=0, show=show)
+    return papers
+
+
+def parse_paper_details(html):
+    """解析arXiv详情页, 返回 Title/Authors/Abstract/Date/PDF/Subjects 字典"""
+    if parser_backend == "lxml":
+        fields = _lxml_details_fields(html)
+    else:
+        fields = _soup_details_fields(html)
+
+    # 提取标题
+    title = fields['title'].replace('Title:', '').strip() if fields['title'] else "未找到标题"
+
+    # 提取作者
+    if fields['authors']:
+        authors_text = fields['authors'].replace('Authors:', '').strip()
+        authors = re.sub(r'\s+', ' ', authors_text)
+    else:
+        authors = "未找到作者"
+
+    # 提取摘要
+    if fields['abstract']:
+        abstract_text = fields['abstract'].replace('Abstract:', '').strip()
+        abstract = re.sub(r'\s+', ' ', abstract_text)
+    else:
+        abstract = "未找到摘要"
+
+    # 提取提交日期
+    date_text = "未知日期"
+    if fields['history']:
+        dates = re.findall(r'\d{1,2}\s\w{3}\s\d{4}', fields['history'])
+        if dates:
+            date_text = dates[-1]  # 取最近的日期
+
+    # 提取PDF链接
+    pdf_url = f"https://arxiv.org{fields['pdf']}" if fields['pdf'] else ""
+
+    # 提取类别
+    subjects = []
+    if fields['subjects']:
+        subjects = [sub.strip() for sub in fields['subjects'].split(';') if sub.strip()]
+
+    return {
+        'Title': title,
+        'Authors': authors,
+        'Abstract': abstract,
+        'Date': date_text,
+        'PDF': pdf_url,
+        'Subjects': subjects
+    }
+
+
+def download_paper_details(url, timeout=None):
+    response = http_client.get(url, headers=HEADERS, timeout=timeout)
+    if response.status_code != 200:
+        raise FetchError(response.status_code)
+    with diagnostics.stage("parse"):
+        return parse_paper_details(response.text)
+
+
+def get_paper_details(url, limiter=None):
+    """优先从本地缓存读取论文详情, 未命中时下载并写入缓存; limiter 为下载前使用的限速器"""
+    cache = get_paper_cache()
+    details = cache.get_details(url)
+    if details is None:
+        if limiter is not None:
+            limiter.acquire()
+        details = download_paper_details(url)
+        cache.set_details(url, details)
+    return details
+
+
+def backfill_details(papers):
+    """通过arXiv API批量补全列表中未缓存论文的详情, 返回 {arXiv编号: API解析结果}"""
+    cache = get_paper_cache()
+    missing = [paper for paper in papers
+               if paper['id'] and cache.get_details(paper['url']) is None]
+    if not missing:
+        return {}
+
+    entries = fetch_details_by_ids([paper['id'] for paper in missing])
+    for paper in missing:
+        entry = entries.get(paper['id'])
+        if not entry:
+            continue
+        details = entry['details']
+        # 列表页的类别带有完整名称, 优先使用
+        if paper['subjects']:
+            details['Subjects'] = paper['subjects']
+        cache.set_details(paper['url'], details)
+        if entry['version']:
+            cache.set_details(f"https://arxiv.org/abs/{entry['id']}{entry['version']}", details)
+    return entries
+
+
+# 类别论文列表的数据源. 网页列表(/recent)为最近几个公告日公布的论文; arXiv API 一次请求即可返回数百篇论文及其摘要,
+# 但只能按提交时间(最近3天, UTC)筛选, 与公告集合不一致(如周一上午只包含周末提交的论文), 因此默认使用网页抓取
+SOURCES = {
+    "html": "网页抓取",
+    "api": "arXiv API",
+}
+DEFAULT_SOURCE = "html"
+
+
+def iter_api_papers(category, days=3, max_results=2000, progress_callback=None):
+    """通过arXiv API流式获取类别最近提交的论文, 详情直接写入缓存, 逐篇产出与列表页相同结构的论文"""
+    cache = get_paper_cache()
+    feed_info = {}
+    for i, entry in enumerate(iter_category_entries(category, days=days, max_results=max_results,
+                                                    feed_info=feed_info)):
+        if not entry['id']:
+            continue
+        if progress_callback:
+            progress_callback(i, max(min(feed_info.get('total', max_results), max_results), i + 1))
+        yield api_entry_to_paper(entry, cache)
+
+
+def api_entry_to_paper(entry, cache):
+    """将API解析结果的详情写入缓存, 返回与列表页相同结构的论文"""
+    details = entry['details']
+    url = f"https://arxiv.org/abs/{entry['id']}"
+    cache.set_details(url, details)
+    if entry['version']:
+        cache.set_details(f"{url}{entry['version']}", details)
+    return {
+        'title': details['Title'],
+        'url': url,
+        'id': entry['id'],
+        'authors': details['Authors'],
+        'subjects': details['Subjects'],
+        'comments': entry['comments'],
+        'version': entry['version'],
+    }
+
+
+def fetch_category_papers(category, source=DEFAULT_SOURCE, max_results=None, progress_callback=None, papers_callback=None):
+    """按数据源获取类别最近的论文列表; API请求失败时回退到网页抓取.
+    progress_callback(i, total) 中 i 为已处理的论文序号; papers_callback(论文列表) 在获取到
+    新论文时立即调用(API逐篇, 网页逐页), 调用方无需等待整个列表"""
+    papers = []
+    if source == "api":
+        try:
+            for paper in iter_api_papers(category, max_results=max_results or 2000,
+                                         progress_callback=progress_callback):
+                papers.append(paper)
+                if papers_callback:
+                    papers_callback([paper])
+        except Exception as e:
+            print(f"arXiv API获取失败, 改用网页抓取: {e}")
+        else:
+            if papers:
+                return papers
+            print("arXiv API未返回论文, 改用网页抓取")
+    elif source != "html":
+        raise ValueError(f"不支持的数据源: {source}")
+
+    # API中途失败时已产出的论文保留, 网页抓取只补充其余论文
+    seen_urls = {paper['url'] for paper in papers}
+    page_size = min(max_results, 500) if max_results else 500
+
+    def report_progress(i, total):
+        if progress_callback:
+            progress_callback(len(papers) + i, len(papers) + total)
+
+    for page in iter_paper_list_pages(category, page_size=page_size, progress_callback=report_progress):
+        page = [paper for paper in page if paper['url'] not in seen_urls]
+        if max_results:
+            page = page[:max_results - len(papers)]
+        papers.extend(page)
+        if papers_callback and page:
+            papers_callback(page)
+        if max_results and len(papers) >= max_results:
+            break
+    return papers
+
+
+async def fetch_list_page_async(category, skip=0, show=100):
+    """异步版 fetch_list_page, 页面在线程池中解析"""
+    url = LIST_URL.format(category=category, skip=skip, show=show)
+    await arxiv_page_limiter().acquire_async()
+    response = await async_http.get(url, headers=HEADERS)
+    if response.status_code != 200:
+        raise FetchError(response.status_code)
+    start = time.perf_counter()
+    papers = await async_http.run_blocking(parse_paper_list, response.text)
+    total = parse_total_entries(response.text)
+    diagnostics.record("parse", time.perf_counter() - start)
+    return papers, total
+
+
+async def download_paper_details_async(url, timeout=None):
+    response = await async_http.get(url, headers=HEADERS, timeout=timeout)
+    if response.status_code != 200:
+        raise FetchError(response.status_code)
+    start = time.perf_counter()
+    details = await async_http.run_blocking(parse_paper_details, response.text)
+    diagnostics.record("parse", time.perf_counter() - start)
+    return details
+
+
+async def fetch_category_papers_async(category, source=DEFAULT_SOURCE, max_results=None, page_size=500, max_pages=20,
+                                      papers_callback=None):
+    """异步版 fetch_category_papers: API请求失败或未返回论文时回退到网页抓取.
+    papers_callback(论文列表) 在每页论文解析完成后调用"""
+    papers = []
+    if source == "api":
+        cache = get_paper_cache()
+
+        def handle_page(entries):
+            page = [api_entry_to_paper(entry, cache) for entry in entries if entry['id']]
+            papers.extend(page)
+            if papers_callback and page:
+                papers_callback(page)
+
+        try:
+            await fetch_category_entries_async(category, max_results=max_results or 2000, page_callback=handle_page)
+        except Exception as e:
+            print(f"arXiv API获取失败, 改用网页抓取: {e}")
+        else:
+            if papers:
+                return papers
+            print("arXiv API未返回论文, 改用网页抓取")
+    elif source != "html":
+        raise ValueError(f"不支持的数据源: {source}")
+
+    seen_urls = {paper['url'] for paper in papers}
+    skip = 0
+    page_size = min(max_results, page_size) if max_results else page_size
+    for _ in range(max_pages):
+        page, total = await fetch_list_page_async(category, skip=skip, show=page_size)
+        # 翻页期间列表可能整体后移, 按链接去重
+        new_papers = [paper for paper in page if paper['url'] not in seen_urls]
+        if max_results:
+            new_papers = new_papers[:max_results - len(papers)]
+        papers.extend(new_papers)
+        seen_urls.update(paper['url'] for paper in page)
+        if papers_callback and new_papers:
+            papers_callback(new_papers)
+        skip += len(page)
+        if (len(page) < page_size or (total is not None and skip >= total)
+                or (max_results and len(papers) >= max_results)):
+            break
+    return papers
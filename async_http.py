@@ -0,0 +1,126 @@
+"""基于 asyncio + httpx 的异步网络层, 与 http_client 共用网络配置和重试策略.
+配合 qasync 在Qt事件循环中运行时, 所有请求都在界面线程中并发进行, 任务可随时取消.
+本模块只依赖 httpx, 不导入Qt(命令行工具也会导入); httpx 未安装时 async_available() 返回False"""
+import time
+import asyncio
+import contextvars
+
+import diagnostics
+from http_client import config, http2_available, is_retryable, RETRY_STATUS_CODES, _backoff_delay
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+_client = None
+_client_loop = None
+
+
+def async_available():
+    return httpx is not None
+
+
+def get_client():
+    """返回当前事件循环共用的 AsyncClient, 单个连接池即可承载数百个并发请求"""
+    global _client, _client_loop
+    loop = asyncio.get_running_loop()
+    if _client is None or _client_loop is not loop:
+        limits = httpx.Limits(max_connections=config["pool_maxsize"] * 16,
+                              max_keepalive_connections=config["pool_maxsize"])
+        _client = httpx.AsyncClient(http2=config["http2"] and http2_available(),
+                                    limits=limits, follow_redirects=True)
+        _client_loop = loop
+    return _client
+
+
+async def close():
+    global _client, _client_loop
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+        _client_loop = None
+
+
+def _make_timeout(timeout):
+    if timeout is None:
+        timeout = (config["connect_timeout"], config["read_timeout"])
+    if isinstance(timeout, tuple):
+        connect, read = timeout
+        return httpx.Timeout(read, connect=connect)
+    return timeout
+
+
+async def request(method, url, timeout=None, max_retries=None, stream=False, **kwargs):
+    """异步版 http_client.request: 超时与指数退避重试相同; stream=True 时需由调用方 aclose()"""
+    client = get_client()
+    timeout = _make_timeout(timeout)
+    max_retries = config["max_retries"] if max_retries is None else max_retries
+
+    attempt = 0
+    while True:
+        try:
+            http_request = client.build_request(method, url, timeout=timeout, **kwargs)
+            # 总是先只读响应头, 以便分别记录首字节时间和下载时间
+            start = time.perf_counter()
+            response = await client.send(http_request, stream=True)
+            ttfb = time.perf_counter() - start
+            if not stream:
+                try:
+                    await response.aread()
+                finally:
+                    await response.aclose()
+            diagnostics.record_request(ttfb, time.perf_counter() - start - ttfb)
+        except httpx.TransportError as e:
+            if attempt >= max_retries or not is_retryable(method, e):
+                raise
+            await asyncio.sleep(_backoff_delay(attempt))
+            attempt += 1
+            continue
+
+        if response.status_code in RETRY_STATUS_CODES and attempt < max_retries and \
+                is_retryable(method, status_code=response.status_code):
+            delay = _backoff_delay(attempt, response)
+            await response.aclose()
+            await asyncio.sleep(delay)
+            attempt += 1
+            continue
+
+        return response
+
+
+async def get(url, **kwargs):
+    return await request("GET", url, **kwargs)
+
+
+async def post(url, **kwargs):
+    return await request("POST", url, **kwargs)
+
+
+async def _timed(iterator):
+    # 等待每段数据的时间计入下载耗时
+    while True:
+        start = time.perf_counter()
+        try:
+            item = await iterator.__anext__()
+        except StopAsyncIteration:
+            diagnostics.record("download", time.perf_counter() - start)
+            return
+        diagnostics.record("download", time.perf_counter() - start)
+        yield item
+
+
+def aiter_lines(response):
+    """逐行读取流式响应(与 http_client.iter_lines 对应)"""
+    return _timed(response.aiter_lines())
+
+
+def aiter_bytes(response):
+    """逐段读取流式响应的响应体"""
+    return _timed(response.aiter_bytes())
+
+
+async def run_blocking(func, *args):
+    """在默认线程池中运行解析等耗时的同步函数, 避免阻塞界面; 复制当前上下文, 耗时记入当前 Trace"""
+    context = contextvars.copy_context()
+    return await asyncio.get_running_loop().run_in_executor(None, context.run, func, *args)
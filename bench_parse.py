@@ -0,0 +1,81 @@
+"""列表页/详情页解析耗时对比: 整页 html.parser (原实现) 与 当前解析器 + 区域解析
+
+用法:
+    python bench_parse.py                       # 使用生成的 2000 篇论文列表页
+    python bench_parse.py list.html abs.html    # 使用保存下来的真实页面 (文件名含 abs 的按详情页处理)
+"""
+import sys
+import time
+
+import arxiv_scraper
+
+ENTRY_TEMPLATE = """
+<dt><a name='item{i}'>[{i}]</a> <a href ="/abs/2510.{i:05d}" title="Abstract" id="2510.{i:05d}">arXiv:2510.{i:05d}</a>
+  [<a href="/pdf/2510.{i:05d}" title="Download PDF">pdf</a>, <a href="/format/2510.{i:05d}" title="Other formats">other</a>]</dt>
+<dd><div class='meta'>
+  <div class='list-title mathjax'><span class='descriptor'>Title:</span> A Study of Benchmark Paper Number {i}</div>
+  <div class='list-authors'><a href="https://arxiv.org/a/a_1">Author A</a>, <a href="https://arxiv.org/a/b_1">Author B</a>, <a href="https://arxiv.org/a/c_1">Author C</a></div>
+  <div class='list-comments mathjax'><span class='descriptor'>Comments:</span> 12 pages, 5 figures</div>
+  <div class='list-subjects'><span class='descriptor'>Subjects:</span> <span class="primary-subject">Computer Vision and Pattern Recognition (cs.CV)</span>; Machine Learning (cs.LG)</div>
+</div></dd>
+"""
+
+PAGE_CHROME = """
+<header><div class="header-breadcrumbs">{nav}</div></header>
+<script>{script}</script>
+<div class="search-block">{nav}</div>
+"""
+
+
+def generate_list_page(entries=2000):
+    nav = "".join(f'<a href="/list/cs.{i}/recent">cs.{i}</a> ' for i in range(200))
+    chrome = PAGE_CHROME.format(nav=nav, script="var x = 1;" * 500)
+    body = "".join(ENTRY_TEMPLATE.format(i=i) for i in range(1, entries + 1))
+    return (f"<html><head><title>cs.CV</title></head><body>{chrome}<div id='dlpage'>"
+            f"<div class='paging'>Total of {entries} entries</div><dl id='articles'>{body}</dl>"
+            f"</div>{chrome}</body></html>")
+
+
+def measure(func, html, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(html)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def run_case(name, func, html, strainer_name, repeat):
+    original_strainer = getattr(arxiv_scraper, strainer_name)
+    original_backend = arxiv_scraper.parser_backend
+    try:
+        # 原实现: html.parser 解析整个页面
+        arxiv_scraper.parser_backend = "html.parser"
+        setattr(arxiv_scraper, strainer_name, None)
+        before = measure(func, html, repeat)
+    finally:
+        arxiv_scraper.parser_backend = original_backend
+        setattr(arxiv_scraper, strainer_name, original_strainer)
+
+    after = measure(func, html, repeat)
+    print(f"{name:<24} 原实现 {before:9.1f} ms   {arxiv_scraper.parser_backend}+区域解析 {after:9.1f} ms   "
+          f"加速 {before / after:5.1f}x")
+
+
+def main(paths):
+    repeat = 3
+    if not paths:
+        run_case("生成的列表页(2000篇)", arxiv_scraper.parse_paper_list, generate_list_page(), "LIST_STRAINER", repeat)
+        return
+
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            html = f.read()
+        if "abs" in path:
+            run_case(path, arxiv_scraper.parse_paper_details, html, "DETAILS_STRAINER", repeat)
+        else:
+            run_case(path, arxiv_scraper.parse_paper_list, html, "LIST_STRAINER", repeat)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,142 @@
+"""跨类别去重: 先按规范化的 arXiv编号(不含版本号)合并交叉列出的论文,
+再按标题+摘要的 MinHash 签名合并编号不同但内容几乎相同的论文(如重复提交)"""
+import re
+import zlib
+import random
+import threading
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from arxiv_id import parse_arxiv_id
+
+# MinHash 签名长度, 分成 BANDS 段建立 LSH 索引: 任意一段完全相同即为候选, 再按估计的相似度确认
+NUM_PERMUTATIONS = 64
+BANDS = 16
+ROWS = NUM_PERMUTATIONS // BANDS
+# 词组集合的 Jaccard 相似度不低于该值视为重复; 改动一两个词的摘要约为 0.8
+SIMILARITY_THRESHOLD = 0.7
+SHINGLE_SIZE = 3
+# 至少一方没有摘要时, 词数不少于该值的标题完全相同才视为重复, 避免 "Introduction" 之类的短标题误判;
+# 双方都有摘要时只按摘要的相似度判断, 标题相同而内容不同的论文不会被合并
+MIN_TITLE_WORDS = 6
+
+WORD_PATTERN = re.compile(r"[a-z0-9]+")
+
+# 哈希函数族 (a * x + b) mod PRIME, 固定随机种子使签名在不同进程间一致;
+# a < 2**31 且 x < 2**32, 乘积不会超出 uint64
+PRIME = 4294967311
+_random = random.Random(20251018)
+_A = [_random.randrange(1, 1 << 31) for _ in range(NUM_PERMUTATIONS)]
+_B = [_random.randrange(0, PRIME) for _ in range(NUM_PERMUTATIONS)]
+if np is not None:
+    _A_ARRAY = np.array(_A, dtype=np.uint64)
+    _B_ARRAY = np.array(_B, dtype=np.uint64)
+
+
+def normalize_id(paper):
+    """论文(字典/记录)或链接的规范化编号: 去掉版本号, 统一小写; 无法解析时返回 None"""
+    url = paper if isinstance(paper, str) else (paper.get('url') or paper.get('id') or "")
+    arxiv_id, _ = parse_arxiv_id(url)
+    return arxiv_id.lower() if arxiv_id else None
+
+
+def normalize_title(title):
+    return " ".join(WORD_PATTERN.findall((title or "").lower()))
+
+
+def shingles(text):
+    words = WORD_PATTERN.findall((text or "").lower())
+    if len(words) < SHINGLE_SIZE:
+        return {" ".join(words)} if words else set()
+    return {" ".join(words[i:i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1)}
+
+
+def minhash(text):
+    """MinHash 签名: 每个哈希函数下所有词组哈希值的最小值; 返回 None 表示文本为空"""
+    hashes = [zlib.crc32(shingle.encode("utf-8")) for shingle in shingles(text)]
+    if not hashes:
+        return None
+    if np is not None:
+        values = np.array(hashes, dtype=np.uint64)
+        signature = (values[:, None] * _A_ARRAY + _B_ARRAY) % np.uint64(PRIME)
+        return tuple(signature.min(axis=0).tolist())
+    return tuple(min((a * value + b) % PRIME for value in hashes) for a, b in zip(_A, _B))
+
+
+def similarity(a, b):
+    """由签名估计的 Jaccard 相似度"""
+    return sum(1 for x, y in zip(a, b) if x == y) / NUM_PERMUTATIONS
+
+
+class Deduplicator:
+    """记录已经出现过的论文, 判断新论文是否为重复. 一次多类别获取共用一个实例"""
+
+    def __init__(self, threshold=SIMILARITY_THRESHOLD):
+        self.threshold = threshold
+        self._lock = threading.Lock()
+        self._ids = set()
+        self._titles = {}
+        self._bands = [{} for _ in range(BANDS)]
+        # 被合并的编号 -> 保留的编号(仅内容重复的论文; 编号相同的交叉列出不记录)
+        self.duplicates = {}
+
+    def is_known(self, paper):
+        """只按编号判断, 不记录该论文; 用于获取详情之前先排除交叉列出的论文"""
+        arxiv_id = normalize_id(paper)
+        with self._lock:
+            return arxiv_id is not None and (arxiv_id in self._ids or arxiv_id in self.duplicates)
+
+    def check(self, paper, abstract=None):
+        """论文与已记录的论文重复时返回保留论文的编号, 否则记录该论文并返回 None"""
+        arxiv_id = normalize_id(paper) or paper.get('url')
+        if abstract is None:
+            abstract = paper.get('abstract') or ""
+        title = normalize_title(paper.get('title'))
+        signature = minhash(f"{title} {abstract}") if abstract else None
+
+        with self._lock:
+            if arxiv_id in self._ids:
+                return arxiv_id
+            if arxiv_id in self.duplicates:
+                return self.duplicates[arxiv_id]
+            original = self._find_similar(title, signature)
+            if original is not None:
+                self.duplicates[arxiv_id] = original
+                return original
+
+            self._ids.add(arxiv_id)
+            if len(title.split()) >= MIN_TITLE_WORDS:
+                self._titles.setdefault(title, (arxiv_id, signature))
+            if signature is not None:
+                for band, value in enumerate(self._band_values(signature)):
+                    self._bands[band].setdefault(value, []).append((signature, arxiv_id))
+        return None
+
+    def _find_similar(self, title, signature):
+        if title in self._titles:
+            original, other = self._titles[title]
+            if signature is None or other is None:
+                return original
+        if signature is None:
+            return None
+        for band, value in enumerate(self._band_values(signature)):
+            for other, arxiv_id in self._bands[band].get(value, ()):
+                if similarity(signature, other) >= self.threshold:
+                    return arxiv_id
+        return None
+
+    @staticmethod
+    def _band_values(signature):
+        return [signature[band * ROWS:(band + 1) * ROWS] for band in range(BANDS)]
+
+    def unique(self, papers, abstracts=None):
+        """返回去重后的论文列表(保持顺序); abstracts 为 {规范化编号: 摘要}, 缺省时使用论文自带的摘要"""
+        abstracts = abstracts or {}
+        return [paper for paper in papers if self.check(paper, abstracts.get(normalize_id(paper))) is None]
+
+    def __len__(self):
+        with self._lock:
+            return len(self._ids)
@@ -0,0 +1,218 @@
+"""端到端耗时统计: 每次获取论文列表、下载论文详情和翻译摘要各记录一条 Trace, 按阶段累计耗时.
+网络层和解析函数通过 contextvars 取得当前的 Trace 记录耗时, 不需要逐层传递参数;
+没有当前 Trace 时(如命令行)记录函数什么也不做"""
+import json
+import time
+import threading
+import contextvars
+from collections import deque
+from contextlib import contextmanager
+
+# 各阶段互不重叠, 总耗时中其余部分(排队、限速等待、重试退避等)显示为"其他"
+STAGES = {
+    "connect": "连接/首字节",  # 发出请求到收到响应头, 包括DNS、建立连接和服务端处理
+    "download": "下载",  # 接收响应体
+    "parse": "解析",
+    "translate": "翻译",  # 翻译引擎中除网络请求外的耗时(故障转移、对冲等待等)
+    "render": "渲染",  # 界面中追加列表行、显示译文
+}
+
+KINDS = {
+    "fetch": "获取列表",
+    "details": "论文详情",
+    "translate": "翻译",
+}
+
+_current_trace = contextvars.ContextVar("current_trace", default=None)
+
+
+class Trace:
+    """一次操作的各阶段耗时. 多个线程可能同时记录(如工作线程下载、界面线程渲染), 累加时加锁"""
+
+    def __init__(self, kind, label=""):
+        self.kind = kind
+        self.label = label
+        self.started_at = time.time()
+        self.stages = dict.fromkeys(STAGES, 0.0)
+        self.requests = 0
+        self.total = None
+        self.error = ""
+        self._start = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def add(self, stage, seconds):
+        with self._lock:
+            self.stages[stage] += max(0.0, seconds)
+
+    def add_request(self, ttfb, download=0.0):
+        with self._lock:
+            self.requests += 1
+            self.stages["connect"] += max(0.0, ttfb)
+            self.stages["download"] += max(0.0, download)
+
+    def recorded_time(self):
+        with self._lock:
+            return sum(self.stages.values())
+
+    def finish(self, error=""):
+        """结束计时并加入记录; 重复调用无效"""
+        with self._lock:
+            if self.total is not None:
+                return
+            self.total = time.perf_counter() - self._start
+            self.error = self.error or error
+        get_recorder().record(self)
+
+    def to_dict(self):
+        with self._lock:
+            stages = dict(self.stages)
+            total = self.total if self.total is not None else time.perf_counter() - self._start
+        return {
+            'kind': self.kind,
+            'label': self.label,
+            'started_at': self.started_at,
+            'total': total,
+            'stages': stages,
+            'other': max(0.0, total - sum(stages.values())),
+            'requests': self.requests,
+            'error': self.error,
+        }
+
+
+def current_trace():
+    return _current_trace.get()
+
+
+@contextmanager
+def use_trace(trace):
+    """在 with 块内(当前线程或协程)将 trace 设为当前 Trace"""
+    token = _current_trace.set(trace)
+    try:
+        yield trace
+    finally:
+        _current_trace.reset(token)
+
+
+def record(stage, seconds):
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.add(stage, seconds)
+
+
+def record_request(ttfb, download=0.0):
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.add_request(ttfb, download)
+
+
+def record_error(message):
+    trace = _current_trace.get()
+    if trace is not None and not trace.error:
+        trace.error = message
+
+
+@contextmanager
+def stage(name, trace=None):
+    """记录块内耗时; 未指定 trace 时记入当前 Trace"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        trace = trace or _current_trace.get()
+        if trace is not None:
+            trace.add(name, time.perf_counter() - start)
+
+
+@contextmanager
+def local_stage(name):
+    """记录块内耗时中扣除期间已计入其他阶段(网络请求、渲染等)的部分, 用于调用翻译引擎这样包含网络请求的步骤"""
+    trace = _current_trace.get()
+    if trace is None:
+        yield
+        return
+    recorded = trace.recorded_time()
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        trace.add(name, time.perf_counter() - start - (trace.recorded_time() - recorded))
+
+
+def _summarize(values):
+    if not values:
+        return None
+    values = sorted(values)
+
+    def percentile(p):
+        return values[min(len(values) - 1, int(round(p / 100 * (len(values) - 1))))]
+
+    return {
+        'mean': sum(values) / len(values),
+        'p50': percentile(50),
+        'p95': percentile(95),
+        'max': values[-1],
+    }
+
+
+class Recorder:
+    """每种操作各保存最近 max_traces 条已结束的 Trace, 提供按操作类型汇总和JSON导出.
+    分开保存是因为后台预取会产生大量详情记录, 不能挤掉获取列表和翻译的记录"""
+
+    def __init__(self, max_traces=200):
+        self.max_traces = max_traces
+        self._lock = threading.Lock()
+        self._traces = {}
+
+    def record(self, trace):
+        with self._lock:
+            if trace.kind not in self._traces:
+                self._traces[trace.kind] = deque(maxlen=self.max_traces)
+            self._traces[trace.kind].append(trace)
+
+    def traces(self):
+        """所有操作的记录, 按开始时间排序"""
+        with self._lock:
+            traces = [trace for kind_traces in self._traces.values() for trace in kind_traces]
+        traces.sort(key=lambda trace: trace.started_at)
+        return [trace.to_dict() for trace in traces]
+
+    def clear(self):
+        with self._lock:
+            self._traces.clear()
+
+    def summary(self):
+        """按操作类型汇总: 次数、失败次数、总耗时分布, 以及各阶段的平均耗时"""
+        grouped = {}
+        for trace in self.traces():
+            grouped.setdefault(trace['kind'], []).append(trace)
+
+        summary = {}
+        for kind, traces in grouped.items():
+            summary[kind] = {
+                'count': len(traces),
+                'errors': sum(1 for trace in traces if trace['error']),
+                'total': _summarize([trace['total'] for trace in traces]),
+                'stages': {name: sum(trace['stages'][name] for trace in traces) / len(traces)
+                           for name in STAGES},
+                'other': sum(trace['other'] for trace in traces) / len(traces),
+            }
+        return summary
+
+    def export_json(self, path, extra=None):
+        data = {
+            'exported_at': time.time(),
+            'stages': STAGES,
+            'summary': self.summary(),
+            'traces': self.traces(),
+        }
+        if extra:
+            data.update(extra)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+
+
+_recorder = Recorder()
+
+
+def get_recorder():
+    return _recorder
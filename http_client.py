@@ -0,0 +1,237 @@
+import time
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import NewConnectionError
+
+import diagnostics
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+# 可重试的状态码: 限流和服务端错误
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+# 服务端未处理请求就拒绝的状态码, 非幂等请求也可以安全重试
+REJECTED_STATUS_CODES = {429}
+
+# 重复发送不会产生副作用的请求方法; 其他方法(如调用按量计费的大模型接口的 POST)只在连接尚未建立时重试
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}
+
+# 所有模块共用的网络配置, 可通过 configure() 修改
+config = {
+    "connect_timeout": 5,
+    "read_timeout": 60,
+    "llm_read_timeout": 30,  # 大模型翻译接口的读取超时, 流式请求为相邻两段数据的最大间隔
+    "max_retries": 3,
+    "backoff_factor": 0.5,
+    "max_backoff": 30,
+    "pool_maxsize": 16,
+    "http2": False,
+}
+
+# REQUEST_ERRORS 用于调用方捕获请求异常, RETRY_ERRORS 为可重试的连接/超时异常
+if httpx is not None:
+    REQUEST_ERRORS = (requests.exceptions.RequestException, httpx.HTTPError)
+    RETRY_ERRORS = (requests.exceptions.ConnectionError, requests.exceptions.Timeout, httpx.TransportError)
+else:
+    REQUEST_ERRORS = (requests.exceptions.RequestException,)
+    RETRY_ERRORS = (requests.exceptions.ConnectionError, requests.exceptions.Timeout)
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def configure(**kwargs):
+    """修改网络配置, 下次请求时按新配置重建共享会话"""
+    global _session
+    unknown = set(kwargs) - set(config)
+    if unknown:
+        raise KeyError(f"未知的网络配置项: {', '.join(sorted(unknown))}")
+    with _session_lock:
+        config.update(kwargs)
+        if _session is not None:
+            _session.close()
+            _session = None
+
+
+def http2_available():
+    if httpx is None:
+        return False
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _create_session():
+    if config["http2"] and http2_available():
+        limits = httpx.Limits(max_connections=config["pool_maxsize"] * 4,
+                              max_keepalive_connections=config["pool_maxsize"])
+        return httpx.Client(http2=True, limits=limits, follow_redirects=True)
+
+    session = requests.Session()
+    # 每个主机保持一个连接池, 复用TCP+TLS连接
+    adapter = HTTPAdapter(pool_connections=8, pool_maxsize=config["pool_maxsize"])
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def get_session():
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = _create_session()
+        return _session
+
+
+def _make_timeout(timeout):
+    if timeout is None:
+        timeout = (config["connect_timeout"], config["read_timeout"])
+    if httpx is not None and isinstance(get_session(), httpx.Client) and isinstance(timeout, tuple):
+        connect, read = timeout
+        return httpx.Timeout(read, connect=connect)
+    return timeout
+
+
+def _backoff_delay(attempt, response=None):
+    # 优先遵循服务端给出的 Retry-After
+    if response is not None:
+        retry_after = response.headers.get("Retry-After")
+        if retry_after and retry_after.isdigit():
+            return min(float(retry_after), config["max_backoff"])
+    return min(config["backoff_factor"] * (2 ** attempt), config["max_backoff"])
+
+
+def _send(session, method, url, timeout, stream, **kwargs):
+    if httpx is not None and isinstance(session, httpx.Client):
+        if stream:
+            http_request = session.build_request(method, url, timeout=timeout, **kwargs)
+            return session.send(http_request, stream=True)
+        return session.request(method, url, timeout=timeout, **kwargs)
+    return session.request(method, url, timeout=timeout, stream=stream, **kwargs)
+
+
+def is_connect_error(error):
+    """连接尚未建立的错误, 此时请求还没有发出"""
+    if isinstance(error, requests.exceptions.ConnectTimeout):
+        return True
+    if isinstance(error, requests.exceptions.ConnectionError):
+        # 连接被拒绝、DNS解析失败等包装在 MaxRetryError.reason 中
+        reason = getattr(error.args[0], "reason", None) if error.args else None
+        return isinstance(reason, NewConnectionError)
+    return httpx is not None and isinstance(error, (httpx.ConnectError, httpx.ConnectTimeout))
+
+
+def is_retryable(method, error=None, status_code=None):
+    """幂等请求在连接/超时错误和 RETRY_STATUS_CODES 时重试; 非幂等请求只在连接错误和限流(429)时重试,
+    读取超时或服务端错误时服务端可能已经处理了请求, 重试会重复提交"""
+    if method.upper() in IDEMPOTENT_METHODS:
+        return True
+    if status_code is not None:
+        return status_code in REJECTED_STATUS_CODES
+    return error is not None and is_connect_error(error)
+
+
+def request(method, url, timeout=None, max_retries=None, stream=False, **kwargs):
+    """带连接复用、超时和指数退避重试的HTTP请求, stream=True 时不预先读取响应体.
+    重试规则见 is_retryable"""
+    session = get_session()
+    timeout = _make_timeout(timeout)
+    max_retries = config["max_retries"] if max_retries is None else max_retries
+
+    attempt = 0
+    while True:
+        try:
+            start = time.perf_counter()
+            response = _send(session, method, url, timeout, stream, **kwargs)
+            _record_timing(response, time.perf_counter() - start)
+        except RETRY_ERRORS as e:
+            if attempt >= max_retries or not is_retryable(method, e):
+                raise
+            time.sleep(_backoff_delay(attempt))
+            attempt += 1
+            continue
+
+        if response.status_code in RETRY_STATUS_CODES and attempt < max_retries and \
+                is_retryable(method, status_code=response.status_code):
+            delay = _backoff_delay(attempt, response)
+            response.close()
+            time.sleep(delay)
+            attempt += 1
+            continue
+
+        return response
+
+
+def _record_timing(response, elapsed):
+    # requests 的 elapsed 为发出请求到解析完响应头的时间; 未使用 stream 时其余部分为下载响应体.
+    # httpx 无法在读完响应体前区分两者, 全部计为首字节时间
+    if isinstance(response, requests.Response):
+        ttfb = min(response.elapsed.total_seconds(), elapsed)
+        diagnostics.record_request(ttfb, elapsed - ttfb)
+    else:
+        diagnostics.record_request(elapsed)
+
+
+def iter_lines(response, encoding="utf-8"):
+    """逐行读取流式响应, 兼容 requests 和 httpx; 等待数据的时间计入下载耗时"""
+    if httpx is not None and isinstance(response, httpx.Response):
+        lines = response.iter_lines()
+    else:
+        # text/event-stream 未声明编码时 requests 默认按 ISO-8859-1 解码
+        response.encoding = encoding
+        lines = response.iter_lines(decode_unicode=True)
+
+    while True:
+        start = time.perf_counter()
+        line = next(lines, None)
+        diagnostics.record("download", time.perf_counter() - start)
+        if line is None:
+            return
+        yield line
+
+
+class _ChunkReader:
+    """将按块迭代的响应体包装成只读文件对象, 供 iterparse 等增量解析器使用"""
+
+    def __init__(self, chunks):
+        self._chunks = chunks
+        self._buffer = b""
+        # 等待网络数据的累计时间, 调用方据此从解析耗时中扣除
+        self.read_time = 0.0
+
+    def read(self, size=-1):
+        while size < 0 or len(self._buffer) < size:
+            start = time.perf_counter()
+            chunk = next(self._chunks, None)
+            elapsed = time.perf_counter() - start
+            self.read_time += elapsed
+            diagnostics.record("download", elapsed)
+            if chunk is None:
+                break
+            self._buffer += chunk
+        if size < 0:
+            data, self._buffer = self._buffer, b""
+        else:
+            data, self._buffer = self._buffer[:size], self._buffer[size:]
+        return data
+
+
+def open_stream(response, chunk_size=64 * 1024):
+    """返回流式响应体的文件对象(已解压), 兼容 requests 和 httpx"""
+    if httpx is not None and isinstance(response, httpx.Response):
+        return _ChunkReader(response.iter_bytes(chunk_size))
+    return _ChunkReader(response.iter_content(chunk_size))
+
+
+def get(url, **kwargs):
+    return request("GET", url, **kwargs)
+
+
+def post(url, **kwargs):
+    return request("POST", url, **kwargs)
@@ -0,0 +1,181 @@
+import os
+import json
+import hashlib
+import time
+import sqlite3
+import threading
+
+from arxiv_id import parse_arxiv_id
+
+# 缓存目录, 可通过环境变量修改
+CACHE_DIR = os.environ.get(
+    "ARXIV_DAILY_CACHE_DIR",
+    os.path.join(os.path.expanduser("~"), ".arxiv_daily")
+)
+
+
+def get_cache_path(filename):
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    return os.path.join(CACHE_DIR, filename)
+
+
+class SqliteCache:
+    """基于SQLite的键值缓存, 支持按条目过期(TTL)和LRU淘汰, 多线程共用一个连接"""
+
+    def __init__(self, path, table, max_entries=5000, default_ttl=None):
+        self.table = table
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(f"""
+            CREATE TABLE IF NOT EXISTS {table} (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                expires REAL,
+                accessed REAL NOT NULL
+            )
+        """)
+        self._conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_accessed ON {table}(accessed)")
+        self._conn.commit()
+
+    def get(self, key):
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT value, expires FROM {self.table} WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+
+            value, expires = row
+            if expires is not None and expires < now:
+                self._conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+                self._conn.commit()
+                return None
+
+            # 更新访问时间用于LRU淘汰
+            self._conn.execute(f"UPDATE {self.table} SET accessed = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+        return json.loads(value)
+
+    def set(self, key, value, ttl=None):
+        now = time.time()
+        ttl = self.default_ttl if ttl is None else ttl
+        expires = now + ttl if ttl else None
+        with self._lock:
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO {self.table} (key, value, expires, accessed) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value, ensure_ascii=False), expires, now)
+            )
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        # 先清理过期条目, 再按最久未访问淘汰超出上限的部分
+        self._conn.execute(
+            f"DELETE FROM {self.table} WHERE expires IS NOT NULL AND expires < ?", (time.time(),)
+        )
+        count = self._conn.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+        overflow = count - self.max_entries
+        if overflow > 0:
+            self._conn.execute(
+                f"DELETE FROM {self.table} WHERE key IN "
+                f"(SELECT key FROM {self.table} ORDER BY accessed ASC LIMIT ?)",
+                (overflow,)
+            )
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute(f"DELETE FROM {self.table}")
+            self._conn.commit()
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+
+
+class PaperCache(SqliteCache):
+    """论文详情缓存, 以 arXiv编号+版本 为键.
+    带版本号的条目内容不会变化, 永久保存; 不带版本号的条目代表最新版本, 按TTL过期.
+    传入 search_index 时写入的详情同时加入本地全文索引"""
+
+    def __init__(self, path=None, max_entries=20000, latest_ttl=24 * 3600, search_index=None):
+        super().__init__(path or get_cache_path("papers.db"), "paper_details", max_entries=max_entries)
+        self.latest_ttl = latest_ttl
+        self.search_index = search_index
+
+    @staticmethod
+    def make_key(url):
+        arxiv_id, version = parse_arxiv_id(url)
+        if not arxiv_id:
+            return None
+        return f"{arxiv_id}|{version}"
+
+    def get_details(self, url):
+        key = self.make_key(url)
+        return self.get(key) if key else None
+
+    def set_details(self, url, details):
+        key = self.make_key(url)
+        if not key:
+            return
+        _, version = parse_arxiv_id(url)
+        self.set(key, details, ttl=0 if version else self.latest_ttl)
+        if self.search_index is not None:
+            self.search_index.add(url, details)
+
+
+class TranslationCache(SqliteCache):
+    """翻译结果缓存, 以 文本哈希+目标语言+翻译方式+模型 为键, 并统计本次运行的命中情况"""
+
+    def __init__(self, path=None, max_entries=5000):
+        super().__init__(path or get_cache_path("translations.db"), "translations", max_entries=max_entries)
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(text, target_lang, method, model_id=None):
+        digest = hashlib.sha256(text.encode('utf-8')).hexdigest()
+        return f"{digest}|{target_lang}|{method}|{model_id or ''}"
+
+    def get_translation(self, text, target_lang, method, model_id=None, count=True):
+        translation = self.get(self.make_key(text, target_lang, method, model_id))
+        if not count:
+            return translation
+        if translation is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return translation
+
+    def set_translation(self, text, target_lang, method, model_id, translation):
+        self.set(self.make_key(text, target_lang, method, model_id), translation)
+
+
+_paper_cache = None
+_translation_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_paper_cache():
+    global _paper_cache
+    with _cache_lock:
+        if _paper_cache is None:
+            # 延迟导入: search_index 依赖本模块的 get_cache_path
+            from search_index import get_search_index
+            search_index = get_search_index()
+            _paper_cache = PaperCache(search_index=search_index)
+            if not len(search_index):
+                search_index.import_paper_cache(_paper_cache)
+        return _paper_cache
+
+
+def get_translation_cache():
+    global _translation_cache
+    with _cache_lock:
+        if _translation_cache is None:
+            _translation_cache = TranslationCache()
+        return _translation_cache
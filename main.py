@@ -1,207 +1,460 @@
 import os
 import sys
-import requests
-from bs4 import BeautifulSoup
+import http_client
 import time
-import re
+import asyncio
+import async_http
+import diagnostics
 from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
-                             QLabel, QLineEdit, QPushButton, QListWidget, QTextEdit,
+                             QLabel, QLineEdit, QPushButton, QListView, QTextEdit,
                              QComboBox, QFrame, QSplitter, QStatusBar, QAction, QFileDialog,
-                             QMessageBox, QListWidgetItem, QProgressBar, QGroupBox)
-from PyQt5.QtCore import Qt, QThread, pyqtSignal
-from PyQt5.QtGui import QFont, QIcon, QPixmap, QColor
-from siliconflow_ai import siliconflow_ts
-from viki import viki_translate_text
-
-
-class ArxivFetcher(QThread):
+                             QMessageBox, QProgressBar, QGroupBox, QSpinBox, QCheckBox, QInputDialog,
+                             QDialog, QTableWidget, QTableWidgetItem, QHeaderView)
+from PyQt5.QtCore import Qt, QObject, QTimer, QAbstractListModel, QModelIndex, pyqtSignal
+from PyQt5.QtGui import QFont, QIcon, QPixmap, QColor, QTextCursor
+try:
+    import qasync
+except ImportError:
+    qasync = None
+from local_cache import get_paper_cache, get_translation_cache
+from arxiv_scraper import (HEADERS, FetchError, SOURCES, DEFAULT_SOURCE, backfill_details, parse_paper_list,
+                           fetch_category_papers, fetch_category_papers_async)
+from sync_state import mark_new_papers, NewPaperMarker
+from search_index import get_search_index
+from paper_filter import PaperFilter
+from relevance import get_ranker, paper_key, load_profile, save_profile
+from dedup import Deduplicator, normalize_id
+from paper_store import to_records
+from prefetch import DetailPrefetcher
+from request_scheduler import DetailRequestScheduler, fetch_details_async
+from translation import store_translation, translation_status, BatchTranslator
+from translation_engines import (TranslationError, stream_with_failover, stream_with_failover_async,
+                                 translate_with_failover, hedged_translate, hedged_translate_async,
+                                 hedge_config, configure_hedging, format_engine_stats, engine_stats)
+from worker_pool import (Task, TaskSignals, TaskPool, ChunkBuffer, ProgressThrottle, PRIORITY_INTERACTIVE,
+                         PRIORITY_FETCH, PRIORITY_BACKGROUND)
+
+
+# 类别选择框中的"全部类别": 并发获取所有类别并合并去重
+ALL_CATEGORIES = "全部类别"
+
+
+def list_page_url(category):
+    return f"https://arxiv.org/list/{category}/recent?skip=0&show=100"
+
+
+class FetcherSignals(TaskSignals):
     progress_updated = pyqtSignal(int, str)
     papers_fetched = pyqtSignal(list)
-    paper_details_fetched = pyqtSignal(dict)
+    papers_chunk = pyqtSignal(list)  # 获取过程中分批发出的论文, 界面逐批追加
+    details_backfilled = pyqtSignal(list)
 
-    def __init__(self, url, parent=None):
-        super().__init__(parent)
-        self.url = url
-        self.fetch_details_for = None
 
-    def run(self):
-        if self.fetch_details_for:
-            self.fetch_paper_details(self.fetch_details_for)
-        else:
+class ArxivFetcher(Task):
+    signals_class = FetcherSignals
+
+    def __init__(self, url, category=None, source=DEFAULT_SOURCE, trace=None, backfill=True):
+        super().__init__()
+        self.url = url
+        self.category = category
+        self.source = source
+        self.trace = trace
+        # 获取全部类别时由 BackfillTask 在所有类别完成后统一补全摘要
+        self.backfill = backfill
+
+    def run_task(self):
+        # 网络请求和解析的耗时记入 trace, 渲染耗时由界面线程记录
+        with diagnostics.use_trace(self.trace):
             self.fetch_paper_list()
 
     def fetch_paper_list(self):
-        self.progress_updated.emit(0, "正在获取论文列表...")
+        self.signals.progress_updated.emit(0, "正在获取论文列表...")
         try:
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-            }
-            response = requests.get(self.url, headers=headers)
-
-            if response.status_code != 200:
-                self.progress_updated.emit(0, f"请求失败，状态码: {response.status_code}")
-                return
-
-            soup = BeautifulSoup(response.text, 'html.parser')
-            dt_tags = soup.find_all('dt')
-            papers = []
-
-            self.progress_updated.emit(30, "解析论文数据...")
-            time.sleep(0.5)
-
-            for i, dt in enumerate(dt_tags):
-                abstract_link = dt.find('a', title="Abstract")
-                if abstract_link:
-                    relative_url = abstract_link.get('href')
-                    full_url = f"https://arxiv.org{relative_url}"
-
-                    # 尝试从列表页提取标题（避免后续单独请求）
-                    next_dd = dt.find_next_sibling('dd')
-                    if next_dd:
-                        title_div = next_dd.find('div', class_='list-title')
-                        if title_div:
-                            title = title_div.text.replace('Title:', '').strip()
-                        else:
-                            title = "未找到标题"
-                    else:
-                        title = "未找到标题"
+            self.signals.progress_updated.emit(30, "解析论文数据...")
 
-                    papers.append({
-                        'title': title,
-                        'url': full_url
-                    })
+            # 进度最多每0.1秒发出一次, 论文每200篇或每50毫秒发出一批
+            progress = ProgressThrottle(self.signals.progress_updated.emit)
+            chunks = ChunkBuffer(lambda papers: self.signals.papers_chunk.emit(to_records(papers)))
+            marker = NewPaperMarker(self.category) if self.category else None
 
+            def report_progress(i, total):
                 # 更新进度
-                progress = 30 + int(70 * i / len(dt_tags))
-                self.progress_updated.emit(progress, f"处理论文 {i + 1}/{len(dt_tags)}")
-
-            self.papers_fetched.emit(papers)
-            self.progress_updated.emit(100, f"成功获取 {len(papers)} 篇论文")
+                progress(30 + int(50 * i / total), f"处理论文 {i + 1}/{total}")
 
-        except Exception as e:
-            self.progress_updated.emit(0, f"发生错误: {str(e)}")
+            def add_papers(papers):
+                if marker is not None:
+                    marker.mark(papers)
+                chunks.add(papers)
 
-    def fetch_paper_details(self, url):
-        self.progress_updated.emit(0, f"获取论文详情: {url}")
-        try:
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-            }
-            response = requests.get(url, headers=headers)
+            if self.category:
+                # 按类别获取时不受单页100篇的限制, API失败时自动改用网页抓取
+                papers = fetch_category_papers(self.category, source=self.source,
+                                               progress_callback=report_progress, papers_callback=add_papers)
+            else:
+                response = http_client.get(self.url, headers=HEADERS)
+                if response.status_code != 200:
+                    self.signals.progress_updated.emit(0, f"请求失败，状态码: {response.status_code}")
+                    return
+                papers = parse_paper_list(response.text, progress_callback=report_progress)
+                add_papers(papers)
+
+            chunks.flush()
+            if marker is not None:
+                marker.commit()
+            self.signals.papers_fetched.emit(papers)
+
+            if self.backfill:
+                # 通过arXiv API批量补全摘要并写入详情缓存
+                self.signals.progress_updated.emit(80, "正在批量获取论文摘要...")
+                try:
+                    backfill_details(papers)
+                except Exception as e:
+                    print(f"批量获取摘要失败: {e}")
+                self.signals.details_backfilled.emit(papers)
+
+            new_count = sum(1 for paper in papers if paper.get('new'))
+            if new_count:
+                self.signals.progress_updated.emit(100, f"成功获取 {len(papers)} 篇论文, 其中新论文 {new_count} 篇")
+            else:
+                self.signals.progress_updated.emit(100, f"成功获取 {len(papers)} 篇论文")
 
-            if response.status_code != 200:
-                self.progress_updated.emit(0, f"请求失败，状态码: {response.status_code}")
-                return
+        except Exception as e:
+            diagnostics.record_error(str(e))
+            self.signals.progress_updated.emit(0, f"发生错误: {str(e)}")
 
-            soup = BeautifulSoup(response.text, 'html.parser')
 
-            # 提取标题
-            title_tag = soup.find('h1', class_='title')
-            title = title_tag.text.replace('Title:', '').strip() if title_tag else "未找到标题"
+class BackfillSignals(TaskSignals):
+    details_backfilled = pyqtSignal(list)
 
-            # 提取作者
-            authors_div = soup.find('div', class_='authors')
-            if authors_div:
-                authors_text = authors_div.text.replace('Authors:', '').strip()
-                authors = re.sub(r'\s+', ' ', authors_text)
-            else:
-                authors = "未找到作者"
 
-            # 提取摘要
-            abstract_block = soup.find('blockquote', class_='abstract')
-            if abstract_block:
-                abstract_text = abstract_block.text.replace('Abstract:', '').strip()
-                abstract = re.sub(r'\s+', ' ', abstract_text)
-            else:
-                abstract = "未找到摘要"
-
-            # 提取提交日期
-            submission_div = soup.find('div', class_='submission-history')
-            date_text = "未知日期"
-            if submission_div:
-                dates = re.findall(r'\d{1,2}\s\w{3}\s\d{4}', submission_div.text)
-                if dates:
-                    date_text = dates[-1]  # 取最近的日期
-
-            # 提取PDF链接
-            pdf_link = soup.find('a', text='pdf')
-            pdf_url = f"https://arxiv.org{pdf_link['href']}" if pdf_link else ""
-
-            # 提取类别
-            subjects = []
-            subjects_div = soup.find('td', class_='tablecell subjects')
-            if subjects_div:
-                subjects = [sub.strip() for sub in subjects_div.text.split(';') if sub.strip()]
-
-            details = {
-                'Title': title,
-                'Authors': authors,
-                'Abstract': abstract,
-                'Date': date_text,
-                'PDF': pdf_url,
-                'Subjects': subjects
-            }
+class BackfillTask(Task):
+    """批量补全摘要. API请求全局串行且有间隔, 整个任务只占用一个线程"""
+    signals_class = BackfillSignals
 
-            self.paper_details_fetched.emit(details)
-            self.progress_updated.emit(100, "论文详情获取完成")
+    def __init__(self, papers):
+        super().__init__()
+        self.papers = papers
 
+    def run_task(self):
+        try:
+            backfill_details(self.papers)
         except Exception as e:
-            self.progress_updated.emit(0, f"获取详情时出错: {str(e)}")
+            print(f"批量获取摘要失败: {e}")
+        self.signals.details_backfilled.emit(self.papers)
 
 
-class TranslationThread(QThread):
+class TranslationSignals(TaskSignals):
     translation_completed = pyqtSignal(str)
+    translation_chunk = pyqtSignal(str)
     progress_updated = pyqtSignal(int, str)
 
-    def __init__(self, text, target_lang, method, api_key=None, model_id=None, parent=None):
-        super().__init__(parent)
+
+class TranslationTask(Task):
+    signals_class = TranslationSignals
+
+    def __init__(self, text, target_lang, method, api_key=None, model_id=None, stream=True, trace=None):
+        super().__init__()
         self.text = text
         self.target_lang = target_lang
         self.method = method
         self.api_key = api_key
         self.model_id = model_id
+        self.stream = stream
+        self.trace = trace
+        self.cancelled = False
 
-    def run(self):
-        self.progress_updated.emit(0, "正在翻译摘要...")
+    def cancel(self):
+        # 流式翻译在收到下一段译文时停止, 不再发出信号
+        self.cancelled = True
 
-        if self.method == "硅基流动API":
-            self.progress_updated.emit(30, "正在处理文本...")
-            self.progress_updated.emit(60, f"正在使用 {self.method} ({self.model_id}) 翻译成 {self.target_lang}...")
-            try:
-                translation = siliconflow_ts(
-                    text=self.text,
-                    target_lang=self.target_lang,
-                    api_key=self.api_key,
-                    model_id=self.model_id
-                )
-            except Exception as e:
-                translation = f"[翻译错误]\n\n错误信息: {str(e)}\n\n原始文本:\n{self.text}"
-        elif self.method == "有道翻译":
-            self.progress_updated.emit(30, "正在处理文本...")
-            self.progress_updated.emit(60, f"正在使用 {self.method} 翻译成 {self.target_lang}...")
+    def run_task(self):
+        self.signals.progress_updated.emit(0, "正在翻译摘要...")
+        self.signals.progress_updated.emit(60, f"正在使用 {self.method} 翻译成 {self.target_lang}...")
+
+        # 所选引擎超时或出错时自动改用最快的可用引擎; 开启对冲请求时整段返回, 不再流式显示
+        hedged = hedge_config["enabled"]
+        with diagnostics.use_trace(self.trace):
             try:
-                lang_code_map = {
-                    "中文": "zh-CHS",
-                    # "英文": "en",
-                    "日文": "ja",
-                    "中文繁体": "zh-CHT",
-                }
-                to_lang_code = lang_code_map.get(self.target_lang, "zh")
-                translation = viki_translate_text(self.text, to_lang=to_lang_code)
-            except Exception as e:
-                translation = f"[翻译错误]\n\n错误信息: {str(e)}\n\n原始文本:\n{self.text}"
+                with diagnostics.local_stage("translate"):
+                    translation, used_method, used_model = self.translate(hedged)
+            except TranslationError as e:
+                diagnostics.record_error(str(e))
+                translation, used_method, used_model = str(e), self.method, self.model_id
+
+        if self.cancelled:
+            return
+
+        store_translation(self.text, self.target_lang, self.method, used_method, used_model, translation)
+        self.signals.translation_completed.emit(translation)
+        self.signals.progress_updated.emit(100, translation_status(self.method, used_method, hedged))
+
+    def translate(self, hedged):
+        """返回 (译文, 实际使用的引擎, 实际使用的模型ID)"""
+        if hedged:
+            # 对冲的两路请求在各自的线程中进行, 其网络耗时计入翻译阶段
+            return hedged_translate(
+                self.text, self.target_lang, self.method, api_key=self.api_key, model_id=self.model_id,
+                cancelled=lambda: self.cancelled
+            )
+        if self.stream:
+            translation, used_method = stream_with_failover(
+                self.text, self.target_lang, self.method, api_key=self.api_key, model_id=self.model_id,
+                on_chunk=self.signals.translation_chunk.emit, cancelled=lambda: self.cancelled
+            )
+        else:
+            translation, used_method = translate_with_failover(
+                self.text, self.target_lang, self.method, api_key=self.api_key, model_id=self.model_id
+            )
+        return translation, used_method, self.model_id
+
+
+class RankSignals(TaskSignals):
+    ranked = pyqtSignal(list, int, float)  # 排序后的论文, 含摘要的论文数, 用时(毫秒)
+
+
+class RankTask(Task):
+    """按兴趣描述对论文排序. 首次计算论文向量较慢, 放在线程池中进行, 不阻塞界面"""
+    signals_class = RankSignals
+
+    def __init__(self, papers, profile):
+        super().__init__()
+        self.papers = papers
+        self.profile = profile
+
+    def run_task(self):
+        # 摘要一次性从本地索引批量读取, 没有摘要的论文只按标题和类别计算
+        start = time.perf_counter()
+        abstracts = get_search_index().get_abstracts(paper_key(paper) for paper in self.papers)
+        ranked = get_ranker().rank(self.papers, self.profile, abstracts)
+        elapsed = (time.perf_counter() - start) * 1000
+        self.signals.ranked.emit([paper for _, paper in ranked], len(abstracts), elapsed)
+
+
+class BatchTranslationSignals(TaskSignals):
+    progress_updated = pyqtSignal(int, str)
+    paper_translated = pyqtSignal(str, str)  # 论文链接, 译文
+    batch_completed = pyqtSignal(int, int)  # 成功数, 失败数
+
+
+class BatchTranslationTask(Task):
+    signals_class = BatchTranslationSignals
+
+    def __init__(self, papers, target_lang, method, api_key=None, model_id=None, max_workers=4):
+        super().__init__()
+        self.translator = BatchTranslator(
+            papers, target_lang, method,
+            api_key=api_key, model_id=model_id, max_workers=max_workers,
+            on_result=self.report
+        )
+
+    def cancel(self):
+        self.translator.cancel()
+
+    def run_task(self):
+        translator = self.translator
+        self.signals.progress_updated.emit(0, f"批量翻译 0/{len(translator.papers)}...")
+        translator.run()
+
+        failed = translator.done - translator.succeeded
+        if translator.cancelled:
+            self.signals.progress_updated.emit(100, f"批量翻译已停止: 成功 {translator.succeeded} 篇, 失败 {failed} 篇")
+        else:
+            self.signals.progress_updated.emit(100, f"批量翻译完成: 成功 {translator.succeeded} 篇, 失败 {failed} 篇")
+        self.signals.batch_completed.emit(translator.succeeded, failed)
+
+    def report(self, paper, translation):
+        if translation is not None:
+            self.signals.paper_translated.emit(paper['url'], translation)
+        total = len(self.translator.papers)
+        done = self.translator.done
+        self.signals.progress_updated.emit(int(99 * done / total), f"批量翻译 {done}/{total}")
+
+
+class DetailSignals(QObject):
+    """将详情调度器工作线程中的回调转为信号, 在界面线程中处理"""
+    details_ready = pyqtSignal(str, dict)
+    details_failed = pyqtSignal(str, str)
+
+    def deliver(self, url, details, error):
+        if error is None:
+            self.details_ready.emit(url, details)
+        elif isinstance(error, FetchError):
+            self.details_failed.emit(url, str(error))
+        else:
+            self.details_failed.emit(url, f"获取详情时出错: {str(error)}")
+
+
+class PaperListModel(QAbstractListModel):
+    """论文列表的数据模型: 数据保存在 PaperRecord 列表中, 各角色的数据在视图需要显示时才计算.
+    过滤时只保留匹配论文的下标, 不逐行隐藏"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.records = []
+        self._rows = None  # 过滤后显示的论文下标, None 表示全部显示
+        self._bold_font = QFont()
+        self._bold_font.setBold(True)
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self.records) if self._rows is None else len(self._rows)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        record = self.record(index.row())
+        if role == Qt.DisplayRole:
+            return record.title
+        if role == Qt.UserRole:
+            return record.url
+        if role == Qt.ToolTipRole:
+            return "\n".join(filter(None, [record.authors, ", ".join(record.subjects)]))
+        # 上次获取以来新出现的论文加粗显示
+        if role == Qt.FontRole and record.new:
+            return self._bold_font
+        return None
+
+    def set_papers(self, papers):
+        self.beginResetModel()
+        self.records = to_records(papers)
+        self._rows = None
+        self.endResetModel()
+
+    def append_papers(self, papers, matches=None):
+        """批量追加: 每批只通知视图一次. matches 为新论文是否匹配当前过滤条件, 不匹配的不显示"""
+        records = to_records(papers)
+        if not records:
+            return
+        start = len(self.records)
+        if matches is not None and self._rows is None and not all(matches):
+            # 之前全部显示, 现在需要隐藏部分新论文: 改为按下标显示, 已有的行不变
+            self._rows = list(range(start))
+
+        if self._rows is None:
+            visible = len(records)
         else:
-            # 其他翻译方式
-            self.progress_updated.emit(60, f"使用 {self.method} 翻译成 {self.target_lang}...")
-            time.sleep(1)
-            translation = f"[使用 {self.method} 翻译]\n 当前并非配置该翻译方法..."
+            new_rows = [start + i for i, matched in enumerate(matches or [True] * len(records)) if matched]
+            visible = len(new_rows)
+        if not visible:
+            self.records.extend(records)
+            return
+
+        first = self.rowCount()
+        self.beginInsertRows(QModelIndex(), first, first + visible - 1)
+        if self._rows is not None:
+            self._rows.extend(new_rows)
+        self.records.extend(records)
+        self.endInsertRows()
+
+    def set_filter(self, matches):
+        """matches 为与 records 一一对应的是否显示列表"""
+        self.beginResetModel()
+        self._rows = None if all(matches) else [i for i, matched in enumerate(matches) if matched]
+        self.endResetModel()
+
+    def record(self, row):
+        return self.records[row if self._rows is None else self._rows[row]]
+
+    def row_of(self, record):
+        rows = range(len(self.records)) if self._rows is None else self._rows
+        for row, i in enumerate(rows):
+            if self.records[i] is record:
+                return row
+        return -1
+
 
-        self.translation_completed.emit(translation)
-        self.progress_updated.emit(100, "翻译完成")
+class DiagnosticsDialog(QDialog):
+    """耗时诊断: 按操作类型汇总各阶段的平均耗时, 列出最近的操作, 可导出为JSON"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("耗时诊断")
+        self.resize(900, 560)
+
+        layout = QVBoxLayout(self)
+        columns = list(diagnostics.STAGES.values()) + ["其他"]
+
+        layout.addWidget(QLabel("汇总 (各阶段为平均耗时, 单位: 毫秒)"))
+        self.summary_table = QTableWidget(0, 6 + len(columns))
+        self.summary_table.setHorizontalHeaderLabels(
+            ["操作", "次数", "失败", "平均", "P50", "P95"] + columns
+        )
+        layout.addWidget(self.summary_table)
+
+        layout.addWidget(QLabel("最近的操作 (单位: 毫秒)"))
+        self.trace_table = QTableWidget(0, 5 + len(columns))
+        self.trace_table.setHorizontalHeaderLabels(["时间", "操作", "对象", "请求数", "总耗时"] + columns)
+        layout.addWidget(self.trace_table, 1)
+
+        for table in (self.summary_table, self.trace_table):
+            table.setEditTriggers(QTableWidget.NoEditTriggers)
+            table.verticalHeader().setVisible(False)
+            table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeToContents)
+
+        button_layout = QHBoxLayout()
+        for text, slot in (("刷新", self.refresh), ("导出JSON", self.export_json),
+                           ("清空", self.clear), ("关闭", self.close)):
+            button = QPushButton(text)
+            button.clicked.connect(slot)
+            button_layout.addWidget(button)
+        layout.addLayout(button_layout)
+
+        self.refresh()
+
+    @staticmethod
+    def set_row(table, row, values):
+        # 耗时(秒)显示为毫秒, 数字右对齐
+        for column, value in enumerate(values):
+            text = f"{value * 1000:.0f}" if isinstance(value, float) else str(value)
+            item = QTableWidgetItem(text)
+            if not isinstance(value, str):
+                item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
+            table.setItem(row, column, item)
+
+    def refresh(self):
+        recorder = diagnostics.get_recorder()
+
+        summary = recorder.summary()
+        self.summary_table.setRowCount(len(summary))
+        for row, (kind, stats) in enumerate(summary.items()):
+            total = stats['total']
+            self.set_row(self.summary_table, row, [
+                diagnostics.KINDS.get(kind, kind), stats['count'], stats['errors'],
+                total['mean'], total['p50'], total['p95'],
+            ] + [stats['stages'][name] for name in diagnostics.STAGES] + [stats['other']])
+
+        # 最新的操作在最上面
+        traces = recorder.traces()[::-1]
+        self.trace_table.setRowCount(len(traces))
+        for row, trace in enumerate(traces):
+            label = trace['label'] + (f" (失败: {trace['error']})" if trace['error'] else "")
+            self.set_row(self.trace_table, row, [
+                time.strftime("%H:%M:%S", time.localtime(trace['started_at'])),
+                diagnostics.KINDS.get(trace['kind'], trace['kind']), label, trace['requests'], trace['total'],
+            ] + [trace['stages'][name] for name in diagnostics.STAGES] + [trace['other']])
+
+    def export_json(self):
+        file_path, _ = QFileDialog.getSaveFileName(
+            self, "导出耗时记录", "diagnostics.json", "JSON文件 (*.json);;所有文件 (*)"
+        )
+        if not file_path:
+            return
+
+        try:
+            # 一并导出翻译引擎的延迟统计
+            diagnostics.get_recorder().export_json(file_path, extra={'engines': engine_stats()})
+            QMessageBox.information(self, "导出成功", "耗时记录已成功导出")
+        except Exception as e:
+            QMessageBox.critical(self, "导出错误", f"导出失败: {str(e)}")
+
+    def clear(self):
+        diagnostics.get_recorder().clear()
+        self.refresh()
 
 
 class ArxivBrowser(QMainWindow):
-    def __init__(self):
+    def __init__(self, async_mode=False):
         super().__init__()
         self.setWindowTitle("arXiv论文浏览器")
         self.setGeometry(70, 70, 1400, 900)  # 增加窗口宽度以适应第三列
@@ -229,6 +482,30 @@ class ArxivBrowser(QMainWindow):
         self.favorites = []
         self.current_category = "cs.CV"  # 默认类别
         self.current_abstract = ""  # 存储当前摘要
+        self.current_url = ""  # 当前显示详情的论文链接
+        self.batch_translator = None
+        self.translator = None
+        self.translation_trace = None  # 当前单篇翻译的各阶段耗时
+        self.fetcher = None  # 获取论文列表的任务
+        self.sweep_fetchers = []  # 获取全部类别时每个类别一个任务
+        self.sweep_backfill = None  # 获取全部类别后统一补全摘要的任务
+        self.fetch_id = 0  # 每次获取递增, 忽略之前尚未结束的获取任务的结果
+
+        # 所有获取和翻译任务共用的线程池
+        self.task_pool = TaskPool()
+
+        # 异步模式下列表、详情和单篇翻译的请求以协程形式在Qt事件循环中运行
+        self.async_mode = async_mode
+        self.async_tasks = {}
+
+        # 后台预取论文详情
+        self.prefetcher = DetailPrefetcher()
+
+        # 选中论文的详情请求统一调度, 只显示最新选中的论文
+        self.detail_scheduler = DetailRequestScheduler()
+        self.detail_signals = DetailSignals(self)
+        self.detail_signals.details_ready.connect(self.handle_details_ready)
+        self.detail_signals.details_failed.connect(self.handle_details_failed)
 
         # 初始化类别
         self.init_categories()
@@ -256,6 +533,7 @@ class ArxivBrowser(QMainWindow):
         # 添加到类别选择框
         for name in self.categories.keys():
             self.category_combo.addItem(name)
+        self.category_combo.addItem(ALL_CATEGORIES)
 
     def init_ui(self):
         # 创建主部件和布局
@@ -319,25 +597,54 @@ class ArxivBrowser(QMainWindow):
         self.category_combo = QComboBox()
         self.category_combo.setMinimumWidth(150)
 
+        # 数据源选择
+        source_label = QLabel("数据源:")
+        self.source_combo = QComboBox()
+        for source, name in SOURCES.items():
+            self.source_combo.addItem(name, userData=source)
+
         # 搜索框
         search_label = QLabel("搜索:")
         self.search_edit = QLineEdit()
         self.search_edit.setPlaceholderText("从搜索到的标题中进行相关的关键词搜索, 如果没有的话就直接不输入...")
         self.search_edit.setMinimumWidth(500)
 
+        # 输入停顿后再过滤, 避免每输入一个字符都遍历整个列表
+        self.filter_timer = QTimer(self)
+        self.filter_timer.setSingleShot(True)
+        self.filter_timer.setInterval(150)
+        self.filter_timer.timeout.connect(self.apply_search_filter)
+        self.search_edit.textChanged.connect(self.filter_timer.start)
+
         # 按钮
         self.fetch_btn = QPushButton("获取论文")
         self.fetch_btn.clicked.connect(self.fetch_papers)
 
+        self.local_search_btn = QPushButton("检索本地库")
+        self.local_search_btn.setToolTip('在以往获取过的所有论文中全文检索, 支持多个关键词、"短语"和前缀匹配(如 diffus*)')
+        self.local_search_btn.clicked.connect(self.search_local_index)
+
+        self.rank_btn = QPushButton("按兴趣排序")
+        self.rank_btn.setToolTip("按与兴趣描述的相关度对当前列表排序, 首次使用时需填写兴趣描述")
+        self.rank_btn.clicked.connect(self.rank_papers)
+
+        self.profile_btn = QPushButton("兴趣描述")
+        self.profile_btn.clicked.connect(self.edit_interest_profile)
+
         self.favorites_btn = QPushButton("收藏夹")
         self.favorites_btn.clicked.connect(self.show_favorites)
 
         # 添加到控制面板
         control_layout.addWidget(category_label)
         control_layout.addWidget(self.category_combo)
+        control_layout.addWidget(source_label)
+        control_layout.addWidget(self.source_combo)
         control_layout.addStretch(1)
         control_layout.addWidget(search_label)
         control_layout.addWidget(self.search_edit)
+        control_layout.addWidget(self.local_search_btn)
+        control_layout.addWidget(self.rank_btn)
+        control_layout.addWidget(self.profile_btn)
         control_layout.addWidget(self.fetch_btn)
         control_layout.addWidget(self.favorites_btn)
 
@@ -403,6 +710,24 @@ class ArxivBrowser(QMainWindow):
         method_layout.addWidget(self.method_combo)
         translation_control_inner_layout.addLayout(method_layout)
 
+        # 对冲请求: 超过所选引擎的百分位延迟仍未返回时, 同时请求另一个引擎
+        hedge_layout = QHBoxLayout()
+        self.hedge_check = QCheckBox("对冲请求")
+        self.hedge_check.setToolTip("翻译耗时超过所选引擎最近延迟的该百分位数时, 同时向另一引擎发出请求, 采用先返回的结果")
+        self.hedge_check.setChecked(hedge_config["enabled"])
+        self.hedge_check.toggled.connect(lambda checked: configure_hedging(enabled=checked))
+        self.hedge_percentile_spin = QSpinBox()
+        self.hedge_percentile_spin.setRange(50, 99)
+        self.hedge_percentile_spin.setPrefix("P")
+        self.hedge_percentile_spin.setValue(hedge_config["percentile"])
+        self.hedge_percentile_spin.valueChanged.connect(lambda value: configure_hedging(percentile=value))
+        self.engine_stats_btn = QPushButton("引擎统计")
+        self.engine_stats_btn.clicked.connect(self.show_engine_stats)
+        hedge_layout.addWidget(self.hedge_check)
+        hedge_layout.addWidget(self.hedge_percentile_spin)
+        hedge_layout.addWidget(self.engine_stats_btn)
+        translation_control_inner_layout.addLayout(hedge_layout)
+
         # API设置区域
         self.api_settings_group = QGroupBox("API设置")
         self.api_settings_group.setVisible(False)
@@ -454,30 +779,53 @@ class ArxivBrowser(QMainWindow):
         self.translate_btn.clicked.connect(self.translate_abstract)
         translation_control_inner_layout.addWidget(self.translate_btn)
 
+        # 批量翻译设置
+        workers_layout = QHBoxLayout()
+        workers_label = QLabel("批量并发数:")
+        self.workers_spin = QSpinBox()
+        self.workers_spin.setRange(1, 16)
+        self.workers_spin.setValue(4)
+        workers_layout.addWidget(workers_label)
+        workers_layout.addWidget(self.workers_spin)
+        translation_control_inner_layout.addLayout(workers_layout)
+
+        # 批量翻译按钮
+        self.translate_all_btn = QPushButton("翻译全部论文")
+        self.translate_all_btn.setStyleSheet(self.translate_btn.styleSheet())
+        self.translate_all_btn.clicked.connect(self.translate_all_papers)
+        translation_control_inner_layout.addWidget(self.translate_all_btn)
+
 
         # 论文列表
-        self.paper_list = QListWidget()
+        self.paper_model = PaperListModel(self)
+        self.paper_list = QListView()
+        self.paper_list.setModel(self.paper_model)
+        # 行高一致且分批布局, 数万行时滚动依然流畅
+        self.paper_list.setUniformItemSizes(True)
+        self.paper_list.setLayoutMode(QListView.Batched)
+        self.paper_list.setBatchSize(200)
+        self.paper_list.setEditTriggers(QListView.NoEditTriggers)
         self.paper_list.setMinimumWidth(300)
         self.paper_list.setStyleSheet("""
-            QListWidget {
+            QListView {
                 background-color: white;
                 border: 1px solid #ddd;
                 border-radius: 12px;  /* 增加圆角 */
                 padding: 5px;
             }
-            QListWidget::item {
+            QListView::item {
                 padding: 10px;
                 border-bottom: 1px solid #eee;
                 border-radius: 8px;  /* 增加列表项圆角 */
                 margin: 3px;
             }
-            QListWidget::item:selected {
+            QListView::item:selected {
                 background-color: #e0e0ff;
                 color: #333;
                 border-radius: 8px;  /* 增加选中项圆角 */
             }
         """)
-        self.paper_list.itemSelectionChanged.connect(self.show_paper_details)
+        self.paper_list.selectionModel().selectionChanged.connect(self.show_paper_details)
 
         # 第二列详情面板
         details_panel = QFrame()
@@ -683,6 +1031,9 @@ class ArxivBrowser(QMainWindow):
         self.setStatusBar(self.status_bar)
         self.status_label = QLabel("就绪")
         self.status_bar.addWidget(self.status_label)
+        self.cache_stats_label = QLabel()
+        self.status_bar.addPermanentWidget(self.cache_stats_label)
+        self.update_cache_stats()
         self.status_bar.addPermanentWidget(self.progress_bar)
 
         # 添加到主布局
@@ -768,6 +1119,10 @@ class ArxivBrowser(QMainWindow):
         # 帮助菜单
         help_menu = menubar.addMenu('帮助')
 
+        diagnostics_action = QAction('耗时诊断', self)
+        diagnostics_action.triggered.connect(self.show_diagnostics)
+        help_menu.addAction(diagnostics_action)
+
         about_action = QAction('关于', self)
         about_action.triggered.connect(self.show_about)
         help_menu.addAction(about_action)
@@ -784,21 +1139,212 @@ class ArxivBrowser(QMainWindow):
     def fetch_papers(self):
         # 获取选中的类别
         category_name = self.category_combo.currentText()
+        source = self.source_combo.currentData()
+        self.fetch_id += 1
+        if category_name == ALL_CATEGORIES:
+            self.fetch_all_categories(source)
+            return
+
         self.current_category = self.categories.get(category_name, "cs.CV")
         # 构建URL
-        url = f"https://arxiv.org/list/{self.current_category}/recent?skip=0&show=100"
+        url = list_page_url(self.current_category)
 
-        # 创建并启动获取线程
-        self.fetcher = ArxivFetcher(url)
-        self.fetcher.progress_updated.connect(self.update_progress)
-        self.fetcher.papers_fetched.connect(self.handle_papers_fetched)
-        self.fetcher.start()
+        # 清空列表, 获取到的论文分批追加
+        self.current_papers = []
+        self.update_paper_list()
+        if self.async_mode:
+            self.start_async("fetch", self.fetch_papers_async(self.current_category, source))
+        else:
+            # 创建并启动获取任务
+            trace = diagnostics.Trace("fetch", self.current_category)
+            self.fetcher = ArxivFetcher(url, category=self.current_category, source=source, trace=trace)
+            self.fetcher.signals.progress_updated.connect(self.update_progress)
+            fetch_id = self.fetch_id
+            self.fetcher.signals.papers_chunk.connect(
+                lambda papers: fetch_id == self.fetch_id and self.append_paper_chunk(papers, trace)
+            )
+            # 已被新的获取取代的任务补全摘要后不再重置预取队列
+            self.fetcher.signals.details_backfilled.connect(
+                lambda papers: fetch_id == self.fetch_id and self.start_prefetch(papers)
+            )
+            # finished 在所有论文批次的信号之后到达, 此时渲染耗时已经记录
+            self.fetcher.signals.finished.connect(trace.finish)
+            self.task_pool.start(self.fetcher, PRIORITY_FETCH)
 
         # 显示进度条
         self.progress_bar.setVisible(True)
         self.status_label.setText(f"正在获取 {category_name} 类别的论文...")
         self.fetch_btn.setEnabled(False)
 
+    def fetch_all_categories(self, source):
+        """并发获取所有类别, 每个类别完成后立即去重并追加到列表, 总耗时取决于最慢的类别"""
+        categories = list(self.categories.values())
+        self.sweep_dedup = Deduplicator()
+        self.sweep_pending = set(categories)
+        self.sweep_failed = []
+        self.sweep_skipped = 0
+        self.current_papers = []
+        self.update_paper_list()
+
+        if self.async_mode:
+            self.start_async("fetch", self.fetch_all_categories_async(categories, source))
+        else:
+            fetch_id = self.fetch_id
+            self.sweep_fetchers = []
+            for category in categories:
+                trace = diagnostics.Trace("fetch", category)
+                fetcher = ArxivFetcher(list_page_url(category), category=category, source=source, trace=trace,
+                                       backfill=False)
+                fetcher.signals.papers_fetched.connect(
+                    lambda papers, c=category, t=trace: fetch_id == self.fetch_id
+                    and self.handle_category_fetched(c, papers, t)
+                )
+                fetcher.signals.finished.connect(trace.finish)
+                fetcher.signals.finished.connect(
+                    lambda c=category: fetch_id == self.fetch_id and self.finish_category_task(c)
+                )
+                self.sweep_fetchers.append(fetcher)
+                self.task_pool.start(fetcher, PRIORITY_FETCH)
+
+        self.progress_bar.setVisible(True)
+        self.update_progress(0, f"正在并发获取 {len(categories)} 个类别的论文...")
+        self.fetch_btn.setEnabled(False)
+
+    async def fetch_all_categories_async(self, categories, source):
+        async def fetch_one(category):
+            # 每个协程在各自的任务中运行, 当前 Trace 互不影响
+            trace = diagnostics.Trace("fetch", category)
+            with diagnostics.use_trace(trace):
+                try:
+                    papers = await fetch_category_papers_async(category, source=source)
+                except Exception as e:
+                    print(f"{category} 获取失败: {e}")
+                    trace.finish(error=str(e))
+                    return category, None, trace
+            mark_new_papers(category, papers)
+            return category, papers, trace
+
+        for next_done in asyncio.as_completed([fetch_one(category) for category in categories]):
+            category, papers, trace = await next_done
+            if papers is not None:
+                self.handle_category_fetched(category, papers, trace)
+                trace.finish()
+            self.finish_category_fetch(category)
+
+        # 全部类别完成后批量补全摘要并预取剩余详情
+        papers = self.current_papers
+        try:
+            await async_http.run_blocking(backfill_details, papers)
+        except Exception as e:
+            print(f"批量获取摘要失败: {e}")
+        self.finish_sweep_backfill(papers)
+
+    def handle_category_fetched(self, category, papers, trace=None):
+        # 交叉列出的论文编号相同; 编号不同但内容重复的论文按本地已有的摘要判断,
+        # 没有摘要的论文在 finish_sweep_backfill 中补全后再判断
+        abstracts = get_search_index().get_abstracts(normalize_id(paper) for paper in papers)
+        unique = self.sweep_dedup.unique(papers, abstracts)
+        self.sweep_skipped += len(papers) - len(unique)
+
+        self.append_paper_chunk(unique, trace)
+        self.sweep_pending.discard(category)
+
+    def finish_category_task(self, category):
+        # 各类别的任务只获取列表, 最后一个类别结束后按合并后的列表统一补全摘要, 不让串行的API请求占满线程池
+        self.finish_category_fetch(category)
+        if not self.sweep_pending:
+            fetch_id = self.fetch_id
+            self.sweep_backfill = BackfillTask(self.current_papers)
+            self.sweep_backfill.signals.details_backfilled.connect(
+                lambda papers: fetch_id == self.fetch_id and self.finish_sweep_backfill(papers)
+            )
+            self.task_pool.start(self.sweep_backfill, PRIORITY_FETCH)
+
+    def finish_sweep_backfill(self, papers):
+        # 列表阶段首次获取的论文本地还没有摘要, 只能按编号和标题合并; 补全摘要后按内容再去重一次
+        abstracts = get_search_index().get_abstracts(normalize_id(paper) for paper in self.current_papers)
+        unique = Deduplicator().unique(self.current_papers, abstracts)
+        removed = len(self.current_papers) - len(unique)
+        if removed:
+            self.sweep_skipped += removed
+            self.current_papers = unique
+            self.update_paper_list()
+            self.status_label.setText(
+                f"补全摘要后又合并重复 {removed} 篇, 共 {len(unique)} 篇论文(合并重复 {self.sweep_skipped} 篇)"
+            )
+        self.start_prefetch(self.current_papers)
+
+    def finish_category_fetch(self, category):
+        if category in self.sweep_pending:
+            # 任务结束却没有返回论文: 该类别获取失败
+            self.sweep_pending.discard(category)
+            self.sweep_failed.append(category)
+
+        total = len(self.categories)
+        done = total - len(self.sweep_pending)
+        message = f"已完成 {done}/{total} 个类别, 共 {len(self.current_papers)} 篇论文"
+        if self.sweep_skipped:
+            message += f", 合并重复 {self.sweep_skipped} 篇"
+        if self.sweep_failed:
+            message += f", 失败: {', '.join(self.sweep_failed)}"
+        self.update_progress(100 if done == total else int(100 * done / total), message)
+
+    def start_async(self, name, coro):
+        """在Qt事件循环中运行协程; 同名的旧任务尚未完成时先取消(连同其网络请求)"""
+        old_task = self.async_tasks.get(name)
+        if old_task is not None and not old_task.done():
+            old_task.cancel()
+        task = asyncio.ensure_future(coro)
+        self.async_tasks[name] = task
+        return task
+
+    def cancel_async(self, name):
+        task = self.async_tasks.pop(name, None)
+        if task is not None and not task.done():
+            task.cancel()
+
+    def list_fetch_running(self):
+        if self.async_mode:
+            task = self.async_tasks.get("fetch")
+            return task is not None and not task.done()
+        if any(fetcher.is_running() for fetcher in self.sweep_fetchers):
+            return True
+        return self.fetcher is not None and self.fetcher.is_running()
+
+    async def fetch_papers_async(self, category, source):
+        trace = diagnostics.Trace("fetch", category)
+        with diagnostics.use_trace(trace):
+            await self.load_papers_async(category, source)
+        trace.finish()
+
+    async def load_papers_async(self, category, source):
+        self.update_progress(0, "正在获取论文列表...")
+        marker = NewPaperMarker(category)
+        try:
+            # 每页解析完成后立即追加到列表
+            papers = await fetch_category_papers_async(
+                category, source=source,
+                papers_callback=lambda page: self.append_paper_chunk(marker.mark(page))
+            )
+            marker.commit()
+
+            # 批量补全摘要需要遵守arXiv API的请求间隔, 放到线程池中进行
+            self.update_progress(80, "正在批量获取论文摘要...")
+            try:
+                await async_http.run_blocking(backfill_details, papers)
+            except Exception as e:
+                print(f"批量获取摘要失败: {e}")
+            self.start_prefetch(papers)
+
+            new_count = sum(1 for paper in papers if paper.get('new'))
+            if new_count:
+                self.update_progress(100, f"成功获取 {len(papers)} 篇论文, 其中新论文 {new_count} 篇")
+            else:
+                self.update_progress(100, f"成功获取 {len(papers)} 篇论文")
+        except Exception as e:
+            diagnostics.record_error(str(e))
+            self.update_progress(0, f"发生错误: {str(e)}")
+
     def update_progress(self, value, message):
         self.progress_bar.setValue(value)
         self.status_label.setText(message)
@@ -807,50 +1353,108 @@ class ArxivBrowser(QMainWindow):
             self.progress_bar.setVisible(False)
             self.fetch_btn.setEnabled(True)
 
-    def handle_papers_fetched(self, papers):
-        self.current_papers = papers
-        self.update_paper_list()
+    def append_paper_chunk(self, papers, trace=None):
+        # 追加时只检查新论文是否匹配当前的搜索条件, 不重置模型, 选中和滚动位置保持不变
+        with diagnostics.stage("render", trace):
+            matches = self.paper_filter.extend(papers)
+            self.paper_model.append_papers(papers, matches)
+            self.current_papers = self.paper_model.records
 
-        # 应用搜索过滤
-        search_text = self.search_edit.text().strip()
-        if search_text:
-            self.filter_papers(search_text)
+    def start_prefetch(self, papers):
+        # 批量补全摘要后, 剩余未缓存的论文交给后台预取
+        self.prefetcher.schedule([paper['url'] for paper in papers])
 
     def update_paper_list(self):
-        self.paper_list.clear()
+        self.paper_model.set_papers(self.current_papers)
+        self.current_papers = self.paper_model.records
 
-        for paper in self.current_papers:
-            item = QListWidgetItem(paper['title'])
-            item.setData(Qt.UserRole, paper['url'])
-            self.paper_list.addItem(item)
+        # 重建过滤索引并应用当前的搜索条件
+        self.paper_filter = PaperFilter(self.current_papers)
+        self.apply_search_filter()
 
-    def filter_papers(self, text):
-        text = text.lower()
+    def apply_search_filter(self):
+        self.filter_timer.stop()
+        self.filter_papers(self.search_edit.text())
 
-        for i in range(self.paper_list.count()):
-            item = self.paper_list.item(i)
-            item_text = item.text().lower()
-            item.setHidden(text not in item_text)
+    def filter_papers(self, text):
+        selected = self.selected_paper()
+        self.paper_model.set_filter(self.paper_filter.match(text))
+
+        # 过滤会重置模型, 选中的论文仍在列表中时恢复选中(不重新加载详情)
+        row = self.paper_model.row_of(selected) if selected is not None else -1
+        if row >= 0:
+            selection_model = self.paper_list.selectionModel()
+            selection_model.blockSignals(True)
+            self.paper_list.setCurrentIndex(self.paper_model.index(row))
+            selection_model.blockSignals(False)
+
+    def selected_paper(self):
+        indexes = self.paper_list.selectionModel().selectedIndexes()
+        if not indexes:
+            return None
+        return self.paper_model.record(indexes[0].row())
 
     def show_paper_details(self):
-        selected_items = self.paper_list.selectedItems()
-        if not selected_items:
+        paper = self.selected_paper()
+        if paper is None:
             return
 
-        selected_item = selected_items[0]
-        paper_url = selected_item.data(Qt.UserRole)
+        paper_url = paper.url
+        if paper_url != self.current_url:
+            # 上一篇论文的流式译文不再追加到新论文的译文框中
+            self.cancel_translation()
+        self.current_url = paper_url
+        self.prefetcher.prioritize(paper_url)
+
+        # 命中本地缓存时直接显示, 并放弃之前尚未返回的请求
+        details = get_paper_cache().get_details(paper_url)
+        if details is not None:
+            self.detail_scheduler.cancel()
+            self.cancel_async("details")
+            self.display_paper_details(details)
+            self.finish_details_request("论文详情获取完成(缓存)")
+            return
 
-        # 创建并启动获取详情的线程
-        self.fetcher = ArxivFetcher(paper_url)
-        self.fetcher.fetch_details_for = paper_url
-        self.fetcher.progress_updated.connect(self.update_progress)
-        self.fetcher.paper_details_fetched.connect(self.display_paper_details)
-        self.fetcher.start()
+        if self.async_mode:
+            # 上一篇论文的请求不再回调; 其下载照常完成并写入缓存, 与预取同一论文的下载合并
+            self.start_async("details", self.load_details_async(paper_url))
+        else:
+            # 交给调度器: 替换尚未开始的旧请求, 与正在进行的同一论文的下载合并
+            self.detail_scheduler.request(paper_url, self.detail_signals.deliver)
 
         # 显示进度条
         self.progress_bar.setVisible(True)
         self.status_label.setText(f"正在获取论文详情...")
 
+    async def load_details_async(self, url):
+        try:
+            details = await fetch_details_async(url)
+        except FetchError as e:
+            self.handle_details_failed(url, str(e))
+            return
+        except Exception as e:
+            self.handle_details_failed(url, f"获取详情时出错: {str(e)}")
+            return
+        self.handle_details_ready(url, details)
+
+    def handle_details_ready(self, url, details):
+        # 调度器只回调最新的请求, 这里再确认一次选中的仍是这篇论文
+        if url != self.current_url:
+            return
+        self.display_paper_details(details)
+        self.finish_details_request("论文详情获取完成")
+
+    def handle_details_failed(self, url, message):
+        if url != self.current_url:
+            return
+        self.finish_details_request(message)
+
+    def finish_details_request(self, message):
+        self.status_label.setText(message)
+        # 论文列表仍在获取时保留进度条
+        if not self.list_fetch_running():
+            self.progress_bar.setVisible(False)
+
     def display_paper_details(self, details):
         self.title_label.setText(f"标题: {details['Title']}")
         self.author_label.setText(f"作者信息: {details['Authors']}")
@@ -866,7 +1470,16 @@ class ArxivBrowser(QMainWindow):
         # 显示摘要
         self.abstract_text.setPlainText(details['Abstract'])
         self.current_abstract = details['Abstract']  # 保存当前摘要用于翻译
-        self.translation_result.clear()  # 清除之前的翻译结果
+
+        # 已有翻译(如批量翻译的结果)时直接显示, 否则清除之前的翻译结果
+        target_lang, method, _, model_id = self.get_translation_settings()
+        cached = get_translation_cache().get_translation(
+            self.current_abstract, target_lang, method, model_id, count=False
+        )
+        if cached is not None:
+            self.translation_result.setPlainText(cached)
+        else:
+            self.translation_result.clear()
 
         # 启用翻译按钮
         self.translate_btn.setEnabled(True)
@@ -920,14 +1533,13 @@ class ArxivBrowser(QMainWindow):
             QMessageBox.warning(self, "错误", "PDF链接无效")
 
     def add_to_favorites(self):
-        selected_items = self.paper_list.selectedItems()
-        if not selected_items:
+        paper = self.selected_paper()
+        if paper is None:
             QMessageBox.warning(self, "错误", "请先选择一篇论文")
             return
 
-        selected_item = selected_items[0]
-        paper_title = selected_item.text()
-        paper_url = selected_item.data(Qt.UserRole)
+        paper_title = paper.title
+        paper_url = paper.url
 
         # 检查是否已在收藏夹
         if any(fav['url'] == paper_url for fav in self.favorites):
@@ -956,6 +1568,63 @@ class ArxivBrowser(QMainWindow):
             """)
             QMessageBox.information(self, "收藏夹", f"已添加到收藏夹: {paper_title}")
 
+    def search_local_index(self):
+        query = self.search_edit.text().strip()
+        if not query:
+            QMessageBox.information(self, "检索本地库", "请输入检索关键词")
+            return
+
+        papers = get_search_index().search(query)
+        # 检索结果可能只在摘要中命中, 清空搜索框以免被标题过滤隐藏
+        self.search_edit.blockSignals(True)
+        self.search_edit.clear()
+        self.search_edit.blockSignals(False)
+        self.current_papers = papers
+        self.update_paper_list()
+        self.status_label.setText(f"本地库中找到 {len(papers)} 篇与 \"{query}\" 相关的论文")
+
+    def edit_interest_profile(self):
+        profile, ok = QInputDialog.getMultiLineText(
+            self, "兴趣描述", "用几句话或关键词描述关注的研究方向(英文效果最好):", load_profile()
+        )
+        if ok:
+            save_profile(profile.strip())
+        return ok
+
+    def rank_papers(self):
+        if not self.current_papers:
+            return
+        profile = load_profile()
+        if not profile:
+            if not self.edit_interest_profile():
+                return
+            profile = load_profile()
+            if not profile:
+                return
+
+        papers = list(self.current_papers)
+        fetch_id = self.fetch_id
+        self.ranker = RankTask(papers, profile)
+        self.ranker.signals.ranked.connect(
+            lambda ranked, abstract_count, elapsed: self.apply_ranking(fetch_id, len(papers), ranked,
+                                                                       abstract_count, elapsed)
+        )
+        self.ranker.signals.finished.connect(lambda: self.rank_btn.setEnabled(True))
+        self.task_pool.start(self.ranker, PRIORITY_INTERACTIVE)
+        self.rank_btn.setEnabled(False)
+        self.status_label.setText(f"正在按相关度排序 {len(papers)} 篇论文...")
+
+    def apply_ranking(self, fetch_id, count, ranked, abstract_count, elapsed):
+        # 排序期间重新获取了列表或追加了论文时放弃这次结果
+        if fetch_id != self.fetch_id or count != len(self.current_papers):
+            self.status_label.setText("论文列表已变化, 请重新排序")
+            return
+        self.current_papers = ranked
+        self.update_paper_list()
+        self.status_label.setText(
+            f"已按相关度排序 {len(ranked)} 篇论文(其中 {abstract_count} 篇含摘要), 用时 {elapsed:.0f} ms"
+        )
+
     def show_favorites(self):
         if not self.favorites:
             QMessageBox.information(self, "收藏夹", "收藏夹为空")
@@ -999,11 +1668,13 @@ class ArxivBrowser(QMainWindow):
         else:
             self.api_settings_group.setVisible(False)
 
-    def translate_abstract(self):
-        if not self.current_abstract:
-            QMessageBox.warning(self, "翻译错误", "没有可翻译的摘要内容")
-            return
+    def show_engine_stats(self):
+        QMessageBox.information(self, "翻译引擎统计", format_engine_stats())
+
+    def show_diagnostics(self):
+        DiagnosticsDialog(self).exec_()
 
+    def get_translation_settings(self):
         target_lang = self.lang_combo.currentText()
         method = self.method_combo.currentText()
 
@@ -1013,33 +1684,171 @@ class ArxivBrowser(QMainWindow):
         if method == "硅基流动API":
             api_key = self.api_key_edit.text().strip()
             model_id = self.model_combo.currentData()
+        return target_lang, method, api_key, model_id
 
-            if not api_key:
-                QMessageBox.warning(self, "API密钥缺失", "请提供有效的API密钥")
-                return
-        # 创建并启动翻译线程
-        self.translator = TranslationThread(
-            self.current_abstract,
-            target_lang,
-            method,
-            api_key=api_key,
-            model_id=model_id
-        )
+    def translate_abstract(self):
+        if not self.current_abstract:
+            QMessageBox.warning(self, "翻译错误", "没有可翻译的摘要内容")
+            return
+
+        target_lang, method, api_key, model_id = self.get_translation_settings()
+        if method == "硅基流动API" and not api_key:
+            QMessageBox.warning(self, "API密钥缺失", "请提供有效的API密钥")
+            return
+
+        # 命中翻译缓存时直接显示, 不再请求翻译接口
+        cached = get_translation_cache().get_translation(self.current_abstract, target_lang, method, model_id)
+        self.update_cache_stats()
+        if cached is not None:
+            self.translation_result.setPlainText(cached)
+            self.status_label.setText("翻译完成(缓存)")
+            return
 
-        self.translator.progress_updated.connect(self.update_progress)
-        self.translator.translation_completed.connect(self.display_translation)
-        self.translator.start()
+        # 放弃之前尚未完成的翻译, 提交新的翻译任务
+        self.translation_result.clear()
+        self.translation_trace = diagnostics.Trace("translate", f"{method} → {target_lang}")
+        if self.async_mode:
+            self.start_async("translate", self.translate_async(
+                self.current_abstract, target_lang, method, api_key, model_id
+            ))
+        else:
+            if self.translator is not None:
+                self.translator.cancel()
+            translator = self.translator = TranslationTask(
+                self.current_abstract,
+                target_lang,
+                method,
+                api_key=api_key,
+                model_id=model_id,
+                trace=self.translation_trace
+            )
+
+            # 取消前已经发出、尚在排队的信号按任务是否仍为当前任务丢弃
+            translator.signals.progress_updated.connect(
+                lambda value, message: translator is self.translator and self.update_progress(value, message)
+            )
+            translator.signals.translation_completed.connect(
+                lambda result: translator is self.translator and self.display_translation(result)
+            )
+            translator.signals.translation_chunk.connect(
+                lambda chunk: translator is self.translator and self.append_translation_chunk(chunk)
+            )
+            self.task_pool.start(translator, PRIORITY_INTERACTIVE)
 
         # 显示进度条
         self.progress_bar.setVisible(True)
         self.status_label.setText(f"正在翻译摘要到{target_lang}...")
         self.translate_btn.setEnabled(False)
 
+    def cancel_translation(self):
+        """放弃进行中的单篇翻译, 之后到达的译文片段和结果都不再显示"""
+        if self.translator is not None:
+            self.translator.cancel()
+            self.translator = None
+        self.cancel_async("translate")
+        if self.translation_trace is not None:
+            self.translation_trace.finish(error="已取消")
+            self.translation_trace = None
+
+    def translate_all_papers(self):
+        # 批量翻译进行中时, 再次点击为停止
+        if self.batch_translator is not None and self.batch_translator.is_running():
+            self.batch_translator.cancel()
+            self.translate_all_btn.setEnabled(False)
+            self.status_label.setText("正在停止批量翻译...")
+            return
+
+        if not self.current_papers:
+            QMessageBox.warning(self, "翻译错误", "当前列表中没有论文")
+            return
+
+        target_lang, method, api_key, model_id = self.get_translation_settings()
+        if method == "硅基流动API" and not api_key:
+            QMessageBox.warning(self, "API密钥缺失", "请提供有效的API密钥")
+            return
+
+        self.batch_translator = BatchTranslationTask(
+            self.current_papers,
+            target_lang,
+            method,
+            api_key=api_key,
+            model_id=model_id,
+            max_workers=self.workers_spin.value()
+        )
+        self.batch_translator.signals.progress_updated.connect(self.update_progress)
+        self.batch_translator.signals.paper_translated.connect(self.handle_paper_translated)
+        self.batch_translator.signals.batch_completed.connect(self.handle_batch_completed)
+        self.task_pool.start(self.batch_translator, PRIORITY_BACKGROUND)
+
+        self.progress_bar.setVisible(True)
+        self.translate_all_btn.setText("停止批量翻译")
+
+    def handle_paper_translated(self, url, translation):
+        if url == self.current_url:
+            self.translation_result.setPlainText(translation)
+        self.update_cache_stats()
+
+    def handle_batch_completed(self, succeeded, failed):
+        self.translate_all_btn.setText("翻译全部论文")
+        self.translate_all_btn.setEnabled(True)
+        self.update_cache_stats()
+
+    async def translate_async(self, text, target_lang, method, api_key, model_id):
+        self.update_progress(0, "正在翻译摘要...")
+        self.update_progress(60, f"正在使用 {method} 翻译成 {target_lang}...")
+        hedged = hedge_config["enabled"]
+        with diagnostics.use_trace(self.translation_trace):
+            try:
+                with diagnostics.local_stage("translate"):
+                    if hedged:
+                        translation, used_method, used_model = await hedged_translate_async(
+                            text, target_lang, method, api_key=api_key, model_id=model_id
+                        )
+                    else:
+                        # 逐段显示的耗时由 append_translation_chunk 计入渲染阶段, 这里扣除
+                        translation, used_method = await stream_with_failover_async(
+                            text, target_lang, method, api_key=api_key, model_id=model_id,
+                            on_chunk=self.append_translation_chunk
+                        )
+                        used_model = model_id
+            except TranslationError as e:
+                diagnostics.record_error(str(e))
+                translation, used_method, used_model = str(e), method, model_id
+
+        store_translation(text, target_lang, method, used_method, used_model, translation)
+        self.display_translation(translation)
+        self.update_progress(100, translation_status(method, used_method, hedged))
+
     def display_translation(self, result):
-        self.translation_result.setPlainText(result)
+        with diagnostics.stage("render", self.translation_trace):
+            self.translation_result.setPlainText(result)
         self.translate_btn.setEnabled(True)
         self.progress_bar.setVisible(False)
         self.status_label.setText("翻译完成")
+        # 译文显示完成即结束本次翻译的计时
+        if self.translation_trace is not None:
+            self.translation_trace.finish()
+            self.translation_trace = None
+
+    def append_translation_chunk(self, chunk):
+        with diagnostics.stage("render", self.translation_trace):
+            cursor = self.translation_result.textCursor()
+            cursor.movePosition(QTextCursor.End)
+            cursor.insertText(chunk)
+            self.translation_result.setTextCursor(cursor)
+
+    def update_cache_stats(self):
+        cache = get_translation_cache()
+        self.cache_stats_label.setText(f"翻译缓存: 命中 {cache.hits} / 未命中 {cache.misses}")
+
+    def closeEvent(self, event):
+        self.prefetcher.stop()
+        self.detail_scheduler.stop()
+        for name in list(self.async_tasks):
+            self.cancel_async(name)
+        # 取消排队和运行中的后台任务, 等待它们结束
+        self.task_pool.shutdown()
+        super().closeEvent(event)
 
     def show_about(self):
         about_text = """
@@ -1071,6 +1880,18 @@ if __name__ == "__main__":
     font = QFont("微软雅黑", 10)
     app.setFont(font)
 
+    if qasync is not None and async_http.async_available():
+        # 安装了 httpx 和 qasync 时, 网络请求以协程形式在Qt事件循环中运行
+        loop = qasync.QEventLoop(app)
+        asyncio.set_event_loop(loop)
+        browser = ArxivBrowser(async_mode=True)
+        browser.show()
+        with loop:
+            loop.run_forever()
+            # 窗口关闭后关闭共用的 AsyncClient 及其连接池
+            loop.run_until_complete(async_http.close())
+        sys.exit(0)
+
     browser = ArxivBrowser()
     browser.show()
     sys.exit(app.exec_())
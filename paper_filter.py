@@ -0,0 +1,37 @@
+class PaperFilter:
+    """论文列表的即时过滤索引: 预先计算每篇论文小写的标题, 过滤时只做子串查找.
+    输入以空格分隔多个关键词时, 标题须包含全部关键词"""
+
+    def __init__(self, papers):
+        self.keys = [paper['title'].lower() for paper in papers]
+        self._last_text = ""
+        self._last_matches = [True] * len(self.keys)
+
+    def extend(self, papers):
+        """追加论文(列表分批到达时), 返回新论文是否匹配当前的过滤条件"""
+        keys = [paper['title'].lower() for paper in papers]
+        terms = self._last_text.split()
+        matches = [all(term in key for term in terms) for key in keys]
+        self.keys.extend(keys)
+        self._last_matches.extend(matches)
+        return matches
+
+    def __len__(self):
+        return len(self.keys)
+
+    def match(self, text):
+        """返回与论文一一对应的是否匹配列表"""
+        text = text.lower().strip()
+        terms = text.split()
+        if not terms:
+            matches = [True] * len(self.keys)
+        elif self._last_text and text.startswith(self._last_text):
+            # 在上次输入的基础上继续输入时结果只会变少, 只需检查上次匹配的论文
+            matches = [matched and all(term in key for term in terms)
+                       for matched, key in zip(self._last_matches, self.keys)]
+        else:
+            matches = [all(term in key for term in terms) for key in self.keys]
+
+        self._last_text = text
+        self._last_matches = matches
+        return matches
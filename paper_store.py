@@ -0,0 +1,45 @@
+class PaperRecord:
+    """论文列表中的一条记录. 使用 __slots__ 代替字典, 大量论文时内存占用明显更小;
+    支持 paper['url'] / paper.get('new') 形式的访问, 可直接替代列表页解析出的字典"""
+
+    __slots__ = ('title', 'url', 'id', 'authors', 'subjects', 'comments', 'new', 'revised')
+
+    def __init__(self, title, url, id=None, authors="", subjects=(), comments="", new=False, revised=False):
+        self.title = title
+        self.url = url
+        self.id = id
+        self.authors = authors
+        self.subjects = tuple(subjects)
+        self.comments = comments
+        self.new = new
+        self.revised = revised
+
+    @classmethod
+    def from_paper(cls, paper):
+        if isinstance(paper, cls):
+            return paper
+        return cls(
+            paper['title'], paper['url'],
+            id=paper.get('id'),
+            authors=paper.get('authors', ""),
+            subjects=paper.get('subjects', ()),
+            comments=paper.get('comments', ""),
+            new=paper.get('new', False),
+            revised=paper.get('revised', False),
+        )
+
+    def __getitem__(self, key):
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def get(self, key, default=None):
+        return getattr(self, key, default)
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+def to_records(papers):
+    return [PaperRecord.from_paper(paper) for paper in papers]
@@ -0,0 +1,105 @@
+import heapq
+import itertools
+import threading
+
+from local_cache import get_paper_cache
+from rate_limit import arxiv_page_limiter
+from request_scheduler import fetch_details
+
+
+class DetailPrefetcher:
+    """后台预取论文详情: 固定数量的工作线程, 与其他 arxiv.org 网页请求共用限速器且让位于界面的请求,
+    优先获取当前选中的论文及其相邻论文, 结果写入本地详情缓存"""
+
+    # 选中论文附近的优先级远高于普通排队的论文
+    SELECTED_PRIORITY = -1000000
+
+    def __init__(self, max_workers=3, neighbour_radius=3):
+        self.neighbour_radius = neighbour_radius
+        self._limiter = arxiv_page_limiter()
+        self._cond = threading.Condition()
+        self._stop_event = threading.Event()
+        self._heap = []
+        self._priorities = {}  # 排队中的url -> 当前优先级
+        self._in_flight = set()
+        self._urls = []
+        self._counter = itertools.count()
+        self._workers = []
+        for i in range(max_workers):
+            worker = threading.Thread(target=self._worker_loop, name=f"prefetch-{i}", daemon=True)
+            worker.start()
+            self._workers.append(worker)
+
+    def schedule(self, urls):
+        """替换预取队列, 按列表顺序依次预取尚未缓存的论文"""
+        cache = get_paper_cache()
+        with self._cond:
+            self._heap.clear()
+            self._priorities.clear()
+            self._urls = list(urls)
+            for index, url in enumerate(self._urls):
+                if url in self._in_flight or cache.get_details(url) is not None:
+                    continue
+                self._push(url, index)
+            self._cond.notify_all()
+
+    def prioritize(self, url):
+        """将选中的论文及其前后相邻论文提到队列最前"""
+        with self._cond:
+            if url not in self._urls:
+                return
+            center = self._urls.index(url)
+            start = max(0, center - self.neighbour_radius)
+            end = min(len(self._urls), center + self.neighbour_radius + 1)
+            for index in range(start, end):
+                neighbour = self._urls[index]
+                if neighbour in self._priorities:
+                    self._push(neighbour, self.SELECTED_PRIORITY + abs(index - center))
+            self._cond.notify_all()
+
+    def pending_count(self):
+        with self._cond:
+            return len(self._priorities) + len(self._in_flight)
+
+    def stop(self):
+        self._stop_event.set()
+        with self._cond:
+            self._heap.clear()
+            self._priorities.clear()
+            self._cond.notify_all()
+
+    def _push(self, url, priority):
+        # 同一url可能有多个堆条目, 出队时只认最新的优先级
+        self._priorities[url] = priority
+        heapq.heappush(self._heap, (priority, next(self._counter), url))
+
+    def _pop(self):
+        with self._cond:
+            while not self._stop_event.is_set():
+                while self._heap:
+                    priority, _, url = heapq.heappop(self._heap)
+                    if self._priorities.get(url) == priority:
+                        del self._priorities[url]
+                        self._in_flight.add(url)
+                        return url
+                self._cond.wait()
+        return None
+
+    def _worker_loop(self):
+        cache = get_paper_cache()
+        while True:
+            url = self._pop()
+            if url is None:
+                return
+            try:
+                if cache.get_details(url) is not None:
+                    continue
+                if not self._limiter.acquire(self._stop_event):
+                    return
+                # 与界面选中论文的请求共享同一次下载; 令牌已在上面取得
+                fetch_details(url, throttle=False)
+            except Exception as e:
+                print(f"预取论文详情失败 {url}: {e}")
+            finally:
+                with self._cond:
+                    self._in_flight.discard(url)
@@ -0,0 +1,86 @@
+import time
+import asyncio
+import threading
+
+
+class TokenBucket:
+    """令牌桶限速器: 平均每秒 rate 个请求, 最多允许 capacity 个突发请求.
+    priority=True 的请求(如用户点击的论文)等待期间, 普通请求(如后台预取)不会取走令牌"""
+
+    def __init__(self, rate, capacity=1):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+        self._priority_waiters = 0
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def try_acquire(self, priority=False):
+        with self._lock:
+            return self._take(priority)
+
+    def _take(self, priority):
+        # 调用时需持有 self._lock
+        self._refill()
+        if self._tokens >= 1 and (priority or not self._priority_waiters):
+            self._tokens -= 1
+            return True
+        return False
+
+    def _wait_time(self):
+        return max(1 - self._tokens, 0.1) / self.rate
+
+    def acquire(self, stop_event=None, priority=False):
+        """阻塞直到获得令牌; 传入 stop_event 时可被提前中断, 中断返回False"""
+        waiting = False
+        try:
+            while True:
+                with self._lock:
+                    if self._take(priority):
+                        return True
+                    if priority and not waiting:
+                        waiting = True
+                        self._priority_waiters += 1
+                    wait = self._wait_time()
+
+                if stop_event is not None:
+                    if stop_event.wait(wait):
+                        return False
+                else:
+                    time.sleep(wait)
+        finally:
+            if waiting:
+                with self._lock:
+                    self._priority_waiters -= 1
+
+    async def acquire_async(self, priority=False):
+        """异步版 acquire, 等待期间不阻塞事件循环"""
+        waiting = False
+        try:
+            while True:
+                with self._lock:
+                    if self._take(priority):
+                        return
+                    if priority and not waiting:
+                        waiting = True
+                        self._priority_waiters += 1
+                    wait = self._wait_time()
+                await asyncio.sleep(wait)
+        finally:
+            if waiting:
+                with self._lock:
+                    self._priority_waiters -= 1
+
+
+# 抓取 arxiv.org 网页(列表页、论文页)时共用的限速器, 避免多个任务并发抓取时请求过密;
+# 界面选中论文的详情请求以 priority=True 获取, 排在后台预取之前
+_arxiv_page_limiter = TokenBucket(1.0, 3)
+
+
+def arxiv_page_limiter():
+    return _arxiv_page_limiter
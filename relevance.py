@@ -0,0 +1,185 @@
+"""按兴趣描述对论文列表排序: 标题+摘要转换为哈希词袋 TF-IDF 向量, 与兴趣描述计算余弦相似度.
+向量按 arXiv编号 缓存, 重新排序时只需在 NumPy 中做一次批量计算. 未安装 NumPy 时退化为纯Python实现"""
+import re
+import json
+import math
+import zlib
+import threading
+from collections import OrderedDict
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from arxiv_id import parse_arxiv_id
+from local_cache import get_cache_path
+
+# 哈希空间大小: 足够大时不同词几乎不会冲突, 向量按稀疏方式保存, 不占用额外内存
+DIMENSION = 1 << 18
+
+# 最多缓存的论文向量数, 超出时淘汰最久未使用的
+MAX_CACHED_VECTORS = 20000
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+(?:-[a-z0-9]+)*")
+
+STOP_WORDS = frozenset("""
+a an and are as at be by can for from has have in is it its of on or our that the their these this
+to we which with via using based into than then also not but such both more most over under while
+""".split())
+
+
+def tokenize(text):
+    """小写分词并加入相邻词组成的二元组, 使 "diffusion model" 这样的短语得到更高权重"""
+    words = [word for word in TOKEN_PATTERN.findall((text or "").lower())
+             if len(word) > 1 and word not in STOP_WORDS]
+    return words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+
+def hash_token(token):
+    # crc32 在不同进程间结果一致(内置 hash 对字符串随机化)
+    return zlib.crc32(token.encode("utf-8")) % DIMENSION
+
+
+def term_vector(text):
+    """返回 (哈希下标, 词频权重) 两个等长序列, 词频按 1 + log(tf) 平滑"""
+    counts = {}
+    for token in tokenize(text):
+        index = hash_token(token)
+        counts[index] = counts.get(index, 0) + 1
+    indices = sorted(counts)
+    weights = [1.0 + math.log(counts[index]) for index in indices]
+    if np is not None:
+        return np.array(indices, dtype=np.int32), np.array(weights, dtype=np.float32)
+    return indices, weights
+
+
+def paper_key(paper):
+    arxiv_id, _ = parse_arxiv_id(paper.get('url') or paper.get('id') or "")
+    return arxiv_id or paper.get('url')
+
+
+class RelevanceRanker:
+    """计算论文与兴趣描述的相关度. IDF 在每次排序时按当前列表统计, 向量本身与列表无关, 可长期缓存.
+    首次计算向量较慢(数千篇含摘要的论文约1秒), 界面中应在后台线程调用"""
+
+    def __init__(self, max_vectors=MAX_CACHED_VECTORS):
+        self.max_vectors = max_vectors
+        self._lock = threading.Lock()
+        # arXiv编号 -> (是否包含摘要, 下标, 权重), 按最近使用排序
+        self._vectors = OrderedDict()
+
+    def paper_vector(self, paper, abstract=None):
+        key = paper_key(paper)
+        has_abstract = bool(abstract)
+        with self._lock:
+            cached = self._vectors.get(key)
+            if cached is not None:
+                self._vectors.move_to_end(key)
+        # 之前只有标题, 现在有了摘要时重新计算
+        if cached is not None and (cached[0] or not has_abstract):
+            return cached[1], cached[2]
+
+        text = " ".join([paper.get('title', ""), " ".join(paper.get('subjects', ())), abstract or ""])
+        indices, weights = term_vector(text)
+        with self._lock:
+            self._vectors[key] = (has_abstract, indices, weights)
+            self._vectors.move_to_end(key)
+            while len(self._vectors) > self.max_vectors:
+                self._vectors.popitem(last=False)
+        return indices, weights
+
+    def scores(self, papers, profile, abstracts=None):
+        """返回每篇论文与兴趣描述的余弦相似度(0~1); abstracts 为 {arXiv编号: 摘要}"""
+        abstracts = abstracts or {}
+        vectors = [self.paper_vector(paper, abstracts.get(paper_key(paper))) for paper in papers]
+        query_indices, query_weights = term_vector(profile)
+        if not papers or len(query_indices) == 0:
+            return [0.0] * len(papers)
+        if np is None:
+            return _python_scores(vectors, query_indices, query_weights)
+        return _numpy_scores(vectors, query_indices, query_weights).tolist()
+
+    def rank(self, papers, profile, abstracts=None):
+        """按相关度从高到低排序, 返回 [(相关度, 论文)]; 相关度相同的保持原顺序"""
+        scores = self.scores(papers, profile, abstracts)
+        order = sorted(range(len(papers)), key=lambda i: -scores[i])
+        return [(scores[i], papers[i]) for i in order]
+
+    def __len__(self):
+        with self._lock:
+            return len(self._vectors)
+
+
+def _numpy_scores(vectors, query_indices, query_weights):
+    # 所有论文的稀疏向量首尾相接: doc_ids[k] 为第k个元素所属的论文
+    lengths = np.fromiter((len(indices) for indices, _ in vectors), dtype=np.int64, count=len(vectors))
+    indices = np.concatenate([indices for indices, _ in vectors])
+    weights = np.concatenate([weights for _, weights in vectors])
+    doc_ids = np.repeat(np.arange(len(vectors)), lengths)
+
+    # 每篇论文内的下标互不相同, bincount 即为文档频率
+    document_count = len(vectors)
+    df = np.bincount(indices, minlength=DIMENSION)
+    idf = np.log((1.0 + document_count) / (1.0 + df)).astype(np.float32) + 1.0
+
+    weights = weights * idf[indices]
+    norms = np.sqrt(np.bincount(doc_ids, weights=weights * weights, minlength=document_count))
+
+    query = np.zeros(DIMENSION, dtype=np.float32)
+    query[query_indices] = query_weights * idf[query_indices]
+    query /= np.linalg.norm(query) or 1.0
+
+    dots = np.bincount(doc_ids, weights=weights * query[indices], minlength=document_count)
+    return np.divide(dots, norms, out=np.zeros_like(dots), where=norms > 0)
+
+
+def _python_scores(vectors, query_indices, query_weights):
+    df = {}
+    for indices, _ in vectors:
+        for index in indices:
+            df[index] = df.get(index, 0) + 1
+    document_count = len(vectors)
+
+    def idf(index):
+        return math.log((1.0 + document_count) / (1.0 + df.get(index, 0))) + 1.0
+
+    query = {index: weight * idf(index) for index, weight in zip(query_indices, query_weights)}
+    query_norm = math.sqrt(sum(value * value for value in query.values())) or 1.0
+
+    scores = []
+    for indices, weights in vectors:
+        dot = 0.0
+        norm = 0.0
+        for index, weight in zip(indices, weights):
+            value = weight * idf(index)
+            norm += value * value
+            dot += value * query.get(index, 0.0)
+        scores.append(dot / (math.sqrt(norm) * query_norm) if norm else 0.0)
+    return scores
+
+
+def load_profile():
+    """读取保存的兴趣描述, 未保存时返回空字符串"""
+    try:
+        with open(get_cache_path("interest_profile.json"), encoding="utf-8") as f:
+            return json.load(f).get("profile", "")
+    except (OSError, ValueError):
+        return ""
+
+
+def save_profile(profile):
+    with open(get_cache_path("interest_profile.json"), "w", encoding="utf-8") as f:
+        json.dump({"profile": profile}, f, ensure_ascii=False, indent=2)
+
+
+_ranker = None
+_ranker_lock = threading.Lock()
+
+
+def get_ranker():
+    global _ranker
+    with _ranker_lock:
+        if _ranker is None:
+            _ranker = RelevanceRanker()
+        return _ranker
@@ -0,0 +1,206 @@
+import asyncio
+import threading
+
+import async_http
+import diagnostics
+from arxiv_scraper import download_paper_details, download_paper_details_async
+from local_cache import get_paper_cache
+from rate_limit import arxiv_page_limiter
+
+
+class _Call:
+    __slots__ = ('event', 'result', 'error', 'task')
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+        self.task = None  # 由协程执行时为对应的 asyncio 任务
+
+
+class SingleFlight:
+    """合并同一键的并发调用: 第一个调用者真正执行, 其余调用者等待并共享它的结果(或异常)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key, func):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = func()
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.event.set()
+        return call.result
+
+    async def do_async(self, key, func):
+        """异步版 do, func 返回协程. 与线程中的 do 调用同样合并: 由线程执行时在线程池中等待结果.
+        调用方被取消时执行中的协程继续运行, 结果照常交给其他等待者"""
+        with self._lock:
+            call = self._calls.get(key)
+            if call is None:
+                call = self._calls[key] = _Call()
+                call.task = asyncio.ensure_future(self._run_async(key, call, func))
+                # 没有调用方等待时(均已取消)也不报告未取回的异常
+                call.task.add_done_callback(lambda task: task.cancelled() or task.exception())
+
+        if call.task is not None:
+            return await asyncio.shield(call.task)
+        await async_http.run_blocking(call.event.wait)
+        if call.error is not None:
+            raise call.error
+        return call.result
+
+    async def _run_async(self, key, call, func):
+        try:
+            call.result = await func()
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.event.set()
+        return call.result
+
+    def in_flight(self, key):
+        with self._lock:
+            return key in self._calls
+
+
+_detail_flights = SingleFlight()
+
+
+def fetch_details(url, throttle=True):
+    """缓存优先获取论文详情; 同一论文正在下载时(如后台预取)等待那次请求的结果, 不重复下载.
+    throttle=True 时下载前优先取得 arxiv.org 网页的共享限速令牌, 调用方已自行限速时传 False"""
+    cache = get_paper_cache()
+    details = cache.get_details(url)
+    if details is not None:
+        return details
+
+    def download():
+        # 排队等待期间可能已被其他请求写入缓存
+        cached = cache.get_details(url)
+        if cached is not None:
+            return cached
+        trace = diagnostics.Trace("details", url)
+        with diagnostics.use_trace(trace):
+            try:
+                # 限速等待计入"其他"
+                if throttle:
+                    arxiv_page_limiter().acquire(priority=True)
+                details = download_paper_details(url)
+            except Exception as e:
+                trace.finish(error=str(e))
+                raise
+        cache.set_details(url, details)
+        trace.finish()
+        return details
+
+    return _detail_flights.do(url, download)
+
+
+async def fetch_details_async(url):
+    """异步版 fetch_details, 与线程中(如后台预取)同一论文的下载合并"""
+    cache = get_paper_cache()
+    details = cache.get_details(url)
+    if details is not None:
+        return details
+
+    async def download():
+        cached = cache.get_details(url)
+        if cached is not None:
+            return cached
+        trace = diagnostics.Trace("details", url)
+        with diagnostics.use_trace(trace):
+            try:
+                await arxiv_page_limiter().acquire_async(priority=True)
+                details = await download_paper_details_async(url)
+            except Exception as e:
+                trace.finish(error=str(e))
+                raise
+        cache.set_details(url, details)
+        trace.finish()
+        return details
+
+    return await _detail_flights.do_async(url, download)
+
+
+class DetailRequestScheduler:
+    """界面选中论文时的详情请求调度: 只有最新一次请求会回调.
+    尚未开始的旧请求直接被新请求替换(取消); 已在下载的旧请求结果照常写入缓存, 但不再回调"""
+
+    def __init__(self, max_workers=2):
+        self._cond = threading.Condition()
+        self._pending = None  # (序号, url, 回调)
+        self._generation = 0
+        self._stopped = False
+        self.cancelled = 0
+        self._workers = []
+        for i in range(max_workers):
+            worker = threading.Thread(target=self._worker_loop, name=f"details-{i}", daemon=True)
+            worker.start()
+            self._workers.append(worker)
+
+    def request(self, url, callback):
+        """请求论文详情, 完成时在工作线程中调用 callback(url, 详情, 异常); 返回本次请求的序号"""
+        with self._cond:
+            self._generation += 1
+            if self._pending is not None:
+                self.cancelled += 1
+            self._pending = (self._generation, url, callback)
+            self._cond.notify()
+            return self._generation
+
+    def cancel(self):
+        """放弃当前所有请求的回调(如选中的论文已命中缓存)"""
+        with self._cond:
+            self._generation += 1
+            if self._pending is not None:
+                self.cancelled += 1
+                self._pending = None
+
+    def is_current(self, generation):
+        with self._cond:
+            return generation == self._generation
+
+    def stop(self):
+        with self._cond:
+            self._stopped = True
+            self._pending = None
+            self._cond.notify_all()
+
+    def _worker_loop(self):
+        while True:
+            with self._cond:
+                while self._pending is None and not self._stopped:
+                    self._cond.wait()
+                if self._stopped:
+                    return
+                generation, url, callback = self._pending
+                self._pending = None
+
+            try:
+                details, error = fetch_details(url), None
+            except Exception as e:
+                details, error = None, e
+
+            if self.is_current(generation):
+                callback(url, details, error)
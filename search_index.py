@@ -0,0 +1,198 @@
+import re
+import json
+import time
+import sqlite3
+import threading
+
+from arxiv_id import parse_arxiv_id
+from local_cache import get_cache_path
+
+# 查询中的短语("..."), 其余按空白切分; 词以 * 结尾时做前缀匹配
+QUERY_PATTERN = re.compile(r'"([^"]*)"|(\S+)')
+WORD_PATTERN = re.compile(r"\w+")
+
+# bm25 各列权重: 标题 > 作者 > 类别 > 摘要
+BM25_WEIGHTS = (10.0, 4.0, 2.0, 1.0)
+
+
+def fts5_available(conn):
+    try:
+        conn.execute("CREATE VIRTUAL TABLE IF NOT EXISTS temp.fts5_probe USING fts5(x)")
+        conn.execute("DROP TABLE temp.fts5_probe")
+    except sqlite3.OperationalError:
+        return False
+    return True
+
+
+def parse_query(query):
+    """将输入拆成 [(词列表, 是否短语, 是否前缀)], 带连字符的词(如 self-supervised)按短语处理"""
+    terms = []
+    for phrase, word in QUERY_PATTERN.findall(query or ""):
+        words = WORD_PATTERN.findall((phrase or word).lower())
+        if not words:
+            continue
+        prefix = not phrase and word.endswith("*")
+        terms.append((words, bool(phrase) or len(words) > 1, prefix))
+    return terms
+
+
+def build_match_query(query):
+    """构造 FTS5 MATCH 表达式: 多个词之间为 AND, 每个词都加引号避免与FTS5语法冲突"""
+    parts = []
+    for words, _, prefix in parse_query(query):
+        part = '"' + " ".join(words) + '"'
+        parts.append(part + "*" if prefix else part)
+    return " AND ".join(parts)
+
+
+class SearchIndex:
+    """本地论文全文索引(SQLite FTS5): 覆盖所有获取并缓存过的论文的标题/作者/类别/摘要,
+    支持多词、短语和前缀检索, 按bm25排序. SQLite未编译FTS5时退化为 LIKE 查询"""
+
+    def __init__(self, path=None):
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path or get_cache_path("search.db"), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS papers (
+                rowid INTEGER PRIMARY KEY,
+                arxiv_id TEXT NOT NULL UNIQUE,
+                url TEXT NOT NULL,
+                title TEXT NOT NULL,
+                authors TEXT NOT NULL,
+                subjects TEXT NOT NULL,
+                abstract TEXT NOT NULL,
+                date TEXT NOT NULL,
+                indexed_at REAL NOT NULL
+            )
+        """)
+        self.use_fts = fts5_available(self._conn)
+        if self.use_fts:
+            # 外部内容表: 正文只存一份, 由触发器同步到全文索引
+            self._conn.executescript("""
+                CREATE VIRTUAL TABLE IF NOT EXISTS paper_fts USING fts5(
+                    title, authors, subjects, abstract,
+                    content='papers', content_rowid='rowid', tokenize='unicode61 remove_diacritics 2'
+                );
+                CREATE TRIGGER IF NOT EXISTS papers_ai AFTER INSERT ON papers BEGIN
+                    INSERT INTO paper_fts(rowid, title, authors, subjects, abstract)
+                    VALUES (new.rowid, new.title, new.authors, new.subjects, new.abstract);
+                END;
+                CREATE TRIGGER IF NOT EXISTS papers_ad AFTER DELETE ON papers BEGIN
+                    INSERT INTO paper_fts(paper_fts, rowid, title, authors, subjects, abstract)
+                    VALUES ('delete', old.rowid, old.title, old.authors, old.subjects, old.abstract);
+                END;
+                CREATE TRIGGER IF NOT EXISTS papers_au AFTER UPDATE ON papers BEGIN
+                    INSERT INTO paper_fts(paper_fts, rowid, title, authors, subjects, abstract)
+                    VALUES ('delete', old.rowid, old.title, old.authors, old.subjects, old.abstract);
+                    INSERT INTO paper_fts(rowid, title, authors, subjects, abstract)
+                    VALUES (new.rowid, new.title, new.authors, new.subjects, new.abstract);
+                END;
+            """)
+        self._conn.commit()
+
+    def _upsert(self, url, details):
+        arxiv_id, _ = parse_arxiv_id(url)
+        if not arxiv_id:
+            return
+        self._conn.execute(
+            "INSERT INTO papers (arxiv_id, url, title, authors, subjects, abstract, date, indexed_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT(arxiv_id) DO UPDATE SET title = excluded.title, authors = excluded.authors, "
+            "subjects = excluded.subjects, abstract = excluded.abstract, date = excluded.date, "
+            "indexed_at = excluded.indexed_at",
+            (arxiv_id, f"https://arxiv.org/abs/{arxiv_id}", details.get('Title', ""),
+             details.get('Authors', ""), "; ".join(details.get('Subjects', [])),
+             details.get('Abstract', ""), details.get('Date', ""), time.time())
+        )
+
+    def add(self, url, details):
+        with self._lock:
+            self._upsert(url, details)
+            self._conn.commit()
+
+    def add_many(self, items):
+        """items 为 (论文链接, 详情字典) 序列, 在一个事务中写入"""
+        with self._lock:
+            for url, details in items:
+                self._upsert(url, details)
+            self._conn.commit()
+
+    def import_paper_cache(self, cache):
+        """导入详情缓存中已有的论文(建立索引之前缓存的部分)"""
+        with cache._lock:
+            rows = cache._conn.execute(f"SELECT key, value FROM {cache.table}").fetchall()
+        self.add_many((key.split("|")[0], json.loads(value)) for key, value in rows)
+
+    def search(self, query, limit=200):
+        """返回按相关度排序的论文列表, 结构与列表页解析结果相同"""
+        terms = parse_query(query)
+        if not terms:
+            return []
+        with self._lock:
+            if self.use_fts:
+                rows = self._conn.execute(
+                    "SELECT p.arxiv_id, p.url, p.title, p.authors, p.subjects FROM paper_fts "
+                    "JOIN papers p ON p.rowid = paper_fts.rowid "
+                    f"WHERE paper_fts MATCH ? ORDER BY bm25(paper_fts, {', '.join(map(str, BM25_WEIGHTS))}) "
+                    "LIMIT ?",
+                    (build_match_query(query), limit)
+                ).fetchall()
+            else:
+                rows = self._like_search(terms, limit)
+        return [{
+            'title': title,
+            'url': url,
+            'id': arxiv_id,
+            'authors': authors,
+            'subjects': [subject for subject in subjects.split("; ") if subject],
+            'comments': "",
+        } for arxiv_id, url, title, authors, subjects in rows]
+
+    def _like_search(self, terms, limit):
+        # 无FTS5时的退化实现: 每个词都须出现在某一列中, 标题命中的排在前面
+        conditions = []
+        params = []
+        title_hits = []
+        for words, _, _ in terms:
+            pattern = "%" + " ".join(words) + "%"
+            conditions.append("(title LIKE ? OR authors LIKE ? OR subjects LIKE ? OR abstract LIKE ?)")
+            params.extend([pattern] * 4)
+            title_hits.append("(title LIKE ?)")
+        order_params = ["%" + " ".join(words) + "%" for words, _, _ in terms]
+        return self._conn.execute(
+            "SELECT arxiv_id, url, title, authors, subjects FROM papers "
+            f"WHERE {' AND '.join(conditions)} ORDER BY {' + '.join(title_hits)} DESC, indexed_at DESC LIMIT ?",
+            params + order_params + [limit]
+        ).fetchall()
+
+    def get_abstracts(self, arxiv_ids, batch_size=500):
+        """批量读取摘要, 返回 {arXiv编号: 摘要}, 未收录的论文不在结果中"""
+        arxiv_ids = list(arxiv_ids)
+        abstracts = {}
+        with self._lock:
+            for start in range(0, len(arxiv_ids), batch_size):
+                batch = arxiv_ids[start:start + batch_size]
+                rows = self._conn.execute(
+                    f"SELECT arxiv_id, abstract FROM papers WHERE arxiv_id IN ({', '.join('?' * len(batch))})",
+                    batch
+                ).fetchall()
+                abstracts.update((arxiv_id, abstract) for arxiv_id, abstract in rows if abstract)
+        return abstracts
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM papers").fetchone()[0]
+
+
+_search_index = None
+_search_index_lock = threading.Lock()
+
+
+def get_search_index():
+    global _search_index
+    with _search_index_lock:
+        if _search_index is None:
+            _search_index = SearchIndex()
+        return _search_index
@@ -1,17 +1,29 @@
-import requests
+import re
 import json
+import http_client
+import async_http
+from http_client import REQUEST_ERRORS
 
+API_URL = "https://api.siliconflow.cn/v1/chat/completions"
 
-def siliconflow_ts(text, target_lang, api_key, model_id):
-    API_URL = "https://api.siliconflow.cn/v1/chat/completions"
+LANG_PROMPTS = {
+    "中文": "请将以下内容翻译成专业、流畅、自然的中文：",
+    "中文繁体": "请将以下内容翻译成专业、流畅、自然的繁体中文：",
+    "日文": "请将以下内容翻译成专业、流畅、自然的日语：",
+}
+
+# 多段打包翻译时使用的分隔符, 形如 <<<1>>>
+SEGMENT_MARKER = "<<<{}>>>"
+SEGMENT_PATTERN = re.compile(r'<<<(\d+)>>>')
+
+BATCH_INSTRUCTION = ("下面有 {count} 段彼此独立的文本, 每段以 <<<编号>>> 开头。"
+                     "请逐段翻译, 每段译文前原样保留对应的 <<<编号>>> 分隔符, "
+                     "不要合并、省略或添加任何段落, 也不要输出其他说明。")
 
-    lang_prompts = {
-        "中文": "请将以下内容翻译成专业、流畅、自然的中文：",
-        "中文繁体": "请将以下内容翻译成专业、流畅、自然的繁体中文：",
-        "日文": "请将以下内容翻译成专业、流畅、自然的日语：",
-    }
 
-    prompt = lang_prompts.get(target_lang, lang_prompts["中文"])
+def build_request(text, target_lang, api_key, model_id, stream=False, max_tokens=2048, prompt=None):
+    if prompt is None:
+        prompt = LANG_PROMPTS.get(target_lang, LANG_PROMPTS["中文"])
 
     full_prompt = f"{prompt}\n\n{text}"
 
@@ -29,18 +41,24 @@ def siliconflow_ts(text, target_lang, api_key, model_id):
             }
         ],
         "temperature": 0.3,
-        "max_tokens": 2048,
+        "max_tokens": max_tokens,
         "response_format": {"type": "text"}
     }
+    if stream:
+        payload["stream"] = True
 
-    try:
-        response = requests.post(API_URL, json=payload, headers=headers)
-        response.raise_for_status()
-        translation_result = response.json()['choices'][0]['message']['content']
+    return headers, payload
+
+
+def llm_timeout(max_tokens=2048):
+    """大模型接口的超时: 读取超时按 llm_read_timeout, 输出上限较大(打包翻译)时按比例放宽"""
+    scale = max(1, max_tokens // 2048)
+    return http_client.config["connect_timeout"], http_client.config["llm_read_timeout"] * scale
 
-        return f"[使用 硅基流动API ({model_id}) 翻译]\n\n{translation_result}"
 
-    except requests.exceptions.RequestException as e:
+def format_error(e, text):
+    """将请求或解析异常转换为与 siliconflow_ts 一致的错误文本"""
+    if isinstance(e, REQUEST_ERRORS):
         error_msg = f"翻译请求失败: {str(e)}"
         if hasattr(e, 'response') and e.response:
             try:
@@ -50,5 +68,162 @@ def siliconflow_ts(text, target_lang, api_key, model_id):
                 error_msg += f"\n状态码: {e.response.status_code}"
         return f"[翻译错误]\n\n{error_msg}\n\n原始文本:\n{text}"
 
-    except (KeyError, IndexError, json.JSONDecodeError) as e:
-        return f"[解析响应失败]\n\n错误: {str(e)}\n\n原始文本:\n{text}"
\ No newline at end of file
+    return f"[解析响应失败]\n\n错误: {str(e)}\n\n原始文本:\n{text}"
+
+
+def siliconflow_ts(text, target_lang, api_key, model_id, timeout=None):
+    headers, payload = build_request(text, target_lang, api_key, model_id)
+
+    try:
+        response = http_client.post(API_URL, json=payload, headers=headers, timeout=timeout or llm_timeout())
+        response.raise_for_status()
+        translation_result = response.json()['choices'][0]['message']['content']
+
+        return f"[使用 硅基流动API ({model_id}) 翻译]\n\n{translation_result}"
+
+    except (REQUEST_ERRORS + (KeyError, IndexError, json.JSONDecodeError)) as e:
+        return format_error(e, text)
+
+
+def siliconflow_ts_stream(text, target_lang, api_key, model_id):
+    """流式翻译(SSE), 逐段产出译文; 第一段为翻译方式说明, 拼接后与 siliconflow_ts 的结果格式一致.
+    出错时直接抛出异常, 可用 format_error 转换为错误文本"""
+    headers, payload = build_request(text, target_lang, api_key, model_id, stream=True)
+
+    response = http_client.post(API_URL, json=payload, headers=headers, timeout=llm_timeout(), stream=True)
+    try:
+        response.raise_for_status()
+        yield f"[使用 硅基流动API ({model_id}) 翻译]\n\n"
+
+        for line in http_client.iter_lines(response):
+            done, content = parse_stream_line(line)
+            if done:
+                break
+            if content:
+                yield content
+    finally:
+        response.close()
+
+
+def parse_stream_line(line):
+    """解析一行SSE数据, 返回 (是否结束, 译文片段)"""
+    if not line or not line.startswith("data:"):
+        return False, None
+    data = line[len("data:"):].strip()
+    if data == "[DONE]":
+        return True, None
+
+    # 推理模型的 reasoning_content 不属于译文, 只取 content
+    delta = json.loads(data)['choices'][0].get('delta', {})
+    return False, delta.get('content')
+
+
+async def siliconflow_ts_stream_async(text, target_lang, api_key, model_id):
+    """异步版 siliconflow_ts_stream, 任务取消时立即关闭连接"""
+    headers, payload = build_request(text, target_lang, api_key, model_id, stream=True)
+
+    response = await async_http.post(API_URL, json=payload, headers=headers, timeout=llm_timeout(), stream=True)
+    try:
+        response.raise_for_status()
+        yield f"[使用 硅基流动API ({model_id}) 翻译]\n\n"
+
+        async for line in async_http.aiter_lines(response):
+            done, content = parse_stream_line(line)
+            if done:
+                break
+            if content:
+                yield content
+    finally:
+        await response.aclose()
+
+
+def estimate_tokens(text):
+    # 粗略估计: 英文约4个字符一个token, 中日文约1个字符一个token
+    cjk = len(re.findall(r'[\u3000-\u9fff\uff00-\uffef]', text))
+    return cjk + (len(text) - cjk) // 4 + 1
+
+
+def pack_texts(texts, max_tokens=4096, context_budget=12000, max_items=10):
+    """按输入上下文预算和输出 max_tokens 将文本分组, 返回下标列表的列表"""
+    groups = []
+    current = []
+    input_tokens = 0
+    for index, text in enumerate(texts):
+        # 每段额外计入分隔符开销; 译文长度按与原文相当估计
+        tokens = estimate_tokens(text) + 10
+        if current and (len(current) >= max_items
+                        or input_tokens + tokens > context_budget
+                        or input_tokens + tokens > max_tokens):
+            groups.append(current)
+            current = []
+            input_tokens = 0
+        current.append(index)
+        input_tokens += tokens
+    if current:
+        groups.append(current)
+    return groups
+
+
+def split_segments(content, count):
+    """按 <<<编号>>> 拆分模型输出, 编号不完整或有空段时返回None"""
+    parts = SEGMENT_PATTERN.split(content)
+    segments = {}
+    # parts 形如 [前缀, 编号1, 文本1, 编号2, 文本2, ...]
+    for number, segment in zip(parts[1::2], parts[2::2]):
+        segments[int(number)] = segment.strip()
+    if sorted(segments) != list(range(1, count + 1)) or not all(segments.values()):
+        return None
+    return [segments[i] for i in range(1, count + 1)]
+
+
+def siliconflow_ts_batch(texts, target_lang, api_key, model_id, max_tokens=4096, context_budget=12000,
+                        limiter=None, stop_event=None):
+    """将多段文本打包进一次请求翻译, 返回与 siliconflow_ts 格式一致的译文列表.
+    返回结果无法按分隔符对齐时, 该组退回逐段单独翻译; 请求本身失败时该组每段均返回错误文本.
+    传入 limiter(令牌桶) 时每次请求前限速, stop_event 被设置时停止, 未翻译的段落为None"""
+    results = [None] * len(texts)
+
+    def acquire():
+        return limiter is None or limiter.acquire(stop_event)
+
+    for group in pack_texts(texts, max_tokens=max_tokens, context_budget=context_budget):
+        if not acquire():
+            break
+        if len(group) == 1:
+            results[group[0]] = siliconflow_ts(texts[group[0]], target_lang, api_key, model_id)
+            continue
+
+        packed = "\n\n".join(f"{SEGMENT_MARKER.format(i + 1)}\n{texts[index]}" for i, index in enumerate(group))
+        prompt = (LANG_PROMPTS.get(target_lang, LANG_PROMPTS["中文"]) + "\n"
+                  + BATCH_INSTRUCTION.format(count=len(group)))
+        headers, payload = build_request(packed, target_lang, api_key, model_id,
+                                         max_tokens=max_tokens, prompt=prompt)
+
+        segments = None
+        try:
+            response = http_client.post(API_URL, json=payload, headers=headers, timeout=llm_timeout(max_tokens))
+            response.raise_for_status()
+            choice = response.json()['choices'][0]
+            # 输出被截断时同样视为无法对齐
+            if choice.get('finish_reason') != 'length':
+                segments = split_segments(choice['message']['content'], len(group))
+        except REQUEST_ERRORS as e:
+            # 接口不可用(限流、服务端错误等)时逐段重发也会失败, 直接返回错误
+            for index in group:
+                results[index] = format_error(e, texts[index])
+            continue
+        except (KeyError, IndexError, json.JSONDecodeError):
+            pass
+
+        if segments is not None:
+            for i, index in enumerate(group):
+                results[index] = f"[使用 硅基流动API ({model_id}) 翻译]\n\n{segments[i]}"
+            continue
+
+        # 无法按分隔符对齐: 逐段单独翻译, 每次请求同样限速
+        for index in group:
+            if not acquire():
+                return results
+            results[index] = siliconflow_ts(texts[index], target_lang, api_key, model_id)
+
+    return results
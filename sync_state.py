@@ -0,0 +1,138 @@
+import time
+import sqlite3
+import threading
+
+from arxiv_api import fetch_details_by_ids
+from arxiv_scraper import iter_paper_list_pages, backfill_details
+from local_cache import get_cache_path, get_paper_cache
+
+
+class SyncState:
+    """记录每个类别已经见过的 arXiv编号及版本, 用于增量同步"""
+
+    def __init__(self, path=None):
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path or get_cache_path("sync.db"), check_same_thread=False)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS seen_papers (
+                category TEXT NOT NULL,
+                arxiv_id TEXT NOT NULL,
+                version TEXT NOT NULL,
+                seen_at REAL NOT NULL,
+                PRIMARY KEY (category, arxiv_id)
+            )
+        """)
+        self._conn.commit()
+
+    def get_seen(self, category):
+        """返回 {arXiv编号: 版本}, 版本未知时为空字符串(按 v1 处理, 见 version_number)"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT arxiv_id, version FROM seen_papers WHERE category = ?", (category,)
+            ).fetchall()
+        return dict(rows)
+
+    def mark_seen(self, category, versions):
+        """versions 为 {arXiv编号: 版本}; 版本未知时不覆盖已记录的版本"""
+        now = time.time()
+        with self._lock:
+            for arxiv_id, version in versions.items():
+                self._conn.execute(
+                    "INSERT INTO seen_papers (category, arxiv_id, version, seen_at) VALUES (?, ?, ?, ?) "
+                    "ON CONFLICT(category, arxiv_id) DO UPDATE SET "
+                    "version = CASE WHEN excluded.version = '' THEN version ELSE excluded.version END",
+                    (category, arxiv_id, version, now)
+                )
+            self._conn.commit()
+
+    def reset(self, category):
+        with self._lock:
+            self._conn.execute("DELETE FROM seen_papers WHERE category = ?", (category,))
+            self._conn.commit()
+
+
+_sync_state = None
+_sync_state_lock = threading.Lock()
+
+
+def get_sync_state():
+    global _sync_state
+    with _sync_state_lock:
+        if _sync_state is None:
+            _sync_state = SyncState()
+        return _sync_state
+
+
+class NewPaperMarker:
+    """分批标记新论文: 开始时读取一次上次的同步记录, 全部标记完后由 commit() 统一记录本次见过的论文.
+    用于界面: 界面需要显示完整列表, 仍会获取全部论文, 只把新论文加粗; 只传输和解析新增部分的是 sync_category"""
+
+    def __init__(self, category):
+        self.category = category
+        self.seen = get_sync_state().get_seen(category)
+        self.versions = {}
+
+    def mark(self, papers):
+        for paper in papers:
+            paper['new'] = bool(self.seen) and paper['id'] not in self.seen
+            if paper['id']:
+                # 通过API获取的论文带有版本号, 网页列表中的论文版本未知
+                self.versions[paper['id']] = paper.get('version', "")
+        return papers
+
+    def commit(self):
+        get_sync_state().mark_seen(self.category, self.versions)
+
+
+def mark_new_papers(category, papers):
+    """与上次同步记录比较, 标记新出现的论文(首次获取该类别时不标记), 并记录本次见过的论文"""
+    marker = NewPaperMarker(category)
+    marker.mark(papers)
+    marker.commit()
+
+
+def version_number(version):
+    """版本号的数字部分. 版本未知(如从网页列表或缓存中见到的论文)时按 v1 处理,
+    这样之后出现的 v2 仍会被识别为修订"""
+    return int(version[1:]) if version else 1
+
+
+def sync_category(category, page_size=500, check_revisions=False):
+    """增量同步一个类别: 只返回上次同步以来新出现的论文(以及开启 check_revisions 时有新版本的论文).
+    列表按提交时间倒序, 某一页全部已见过时即停止翻页"""
+    state = get_sync_state()
+    seen = state.get_seen(category)
+    new_papers = []
+    known_papers = []
+
+    for page in iter_paper_list_pages(category, page_size=page_size):
+        unseen = [paper for paper in page if paper['id'] and paper['id'] not in seen]
+        new_papers.extend(unseen)
+        known_papers.extend(paper for paper in page if paper['id'] in seen)
+        if not unseen and not check_revisions:
+            break
+
+    versions = {paper['id']: "" for paper in new_papers}
+    entries = backfill_details(new_papers)
+    for arxiv_id, entry in entries.items():
+        versions[arxiv_id] = entry['version']
+
+    revised_papers = []
+    if check_revisions and known_papers:
+        # 批量查询已见论文的当前版本, 版本号变大的视为修订
+        cache = get_paper_cache()
+        entries = fetch_details_by_ids([paper['id'] for paper in known_papers])
+        for paper in known_papers:
+            entry = entries.get(paper['id'])
+            if not entry:
+                continue
+            if version_number(entry['version']) > version_number(seen[paper['id']]):
+                details = entry['details']
+                if paper['subjects']:
+                    details['Subjects'] = paper['subjects']
+                cache.set_details(paper['url'], details)
+                revised_papers.append(dict(paper, revised=True))
+            versions[paper['id']] = entry['version']
+
+    state.mark_seen(category, versions)
+    return new_papers + revised_papers
@@ -0,0 +1,36 @@
+from dedup import Deduplicator
+
+TITLE = "A Simple Baseline for Open Vocabulary Semantic Segmentation"
+ABSTRACT = ("We propose a simple baseline for open vocabulary semantic segmentation that pairs a frozen "
+            "vision language model with a lightweight mask decoder and reaches strong results on ADE20K.")
+OTHER_ABSTRACT = ("This paper studies graph neural networks for molecular property prediction and introduces "
+                  "a message passing scheme that scales to millions of molecules in drug discovery datasets.")
+
+
+def paper(arxiv_id, title=TITLE):
+    return {'url': f"https://arxiv.org/abs/{arxiv_id}", 'title': title}
+
+
+def test_cross_listed_versions_are_merged():
+    dedup = Deduplicator()
+    assert dedup.check(paper("2401.00001v1"), ABSTRACT) is None
+    assert dedup.check(paper("2401.00001v2"), ABSTRACT) == "2401.00001"
+
+
+def test_near_duplicate_abstract_is_merged():
+    dedup = Deduplicator()
+    assert dedup.check(paper("2401.00001"), ABSTRACT) is None
+    assert dedup.check(paper("2401.00002"), ABSTRACT.replace("strong", "competitive")) == "2401.00001"
+
+
+def test_same_title_different_abstract_is_kept():
+    dedup = Deduplicator()
+    assert dedup.check(paper("2401.00001"), ABSTRACT) is None
+    assert dedup.check(paper("2401.00002"), OTHER_ABSTRACT) is None
+    assert dedup.duplicates == {}
+
+
+def test_same_title_without_abstract_is_merged():
+    dedup = Deduplicator()
+    assert dedup.check(paper("2401.00001"), ABSTRACT) is None
+    assert dedup.check(paper("2401.00002"), "") == "2401.00001"
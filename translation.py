@@ -0,0 +1,192 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from siliconflow_ai import siliconflow_ts_batch, pack_texts
+from local_cache import get_translation_cache
+from arxiv_scraper import get_paper_details, backfill_details
+from rate_limit import TokenBucket, arxiv_page_limiter
+from translation_engines import (TranslationError, is_translation_error, online_engine_names,
+                                 translate_with_failover, hedged_translate, hedge_config)
+
+SUPPORTED_METHODS = online_engine_names()
+
+
+def translate_text(text, target_lang, method, api_key=None, model_id=None):
+    """使用指定的翻译方式翻译, 该引擎超时或出错时自动改用其他可用引擎; 开启对冲请求时
+    慢请求会同时发往另一个引擎或模型. 返回 (译文, 实际使用的翻译方式, 实际使用的模型ID);
+    全部失败时译文为以 [翻译错误] 开头的说明文本"""
+    try:
+        if hedge_config["enabled"]:
+            return hedged_translate(text, target_lang, method, api_key=api_key, model_id=model_id)
+        translation, used_method = translate_with_failover(text, target_lang, method, api_key=api_key,
+                                                           model_id=model_id)
+    except TranslationError as e:
+        return str(e), method, model_id
+    return translation, used_method, model_id if used_method == method else None
+
+
+def translate_cached(text, target_lang, method, api_key=None, model_id=None, limiter=None):
+    """先查翻译缓存, 未命中时翻译并写入缓存, 返回 (译文, 是否命中缓存).
+    传入 limiter(令牌桶) 时仅在真正请求翻译接口前限速"""
+    cache = get_translation_cache()
+    cached = cache.get_translation(text, target_lang, method, model_id)
+    if cached is not None:
+        return cached, True
+
+    if limiter is not None:
+        limiter.acquire()
+
+    translation, used_method, used_model = translate_text(text, target_lang, method, api_key=api_key,
+                                                          model_id=model_id)
+    store_translation(text, target_lang, method, used_method, used_model, translation)
+    return translation, False
+
+
+def store_translation(text, target_lang, method, used_method, model_id, translation):
+    """翻译成功时写入缓存; model_id 为实际使用的模型, 故障转移或对冲到其他引擎时按实际使用的引擎写入"""
+    if is_translation_error(translation):
+        return
+    if used_method != method:
+        model_id = None
+    get_translation_cache().set_translation(text, target_lang, used_method, model_id, translation)
+
+
+def translation_status(method, used_method, hedged=False):
+    if used_method == method:
+        return "翻译完成"
+    if hedged:
+        return f"翻译完成(对冲请求, {used_method} 先返回)"
+    return f"翻译完成({method} 不可用, 已改用 {used_method})"
+
+
+class BatchTranslator:
+    """批量翻译一组论文的摘要: 线程池并发 + 按翻译方式限速, 结果写入翻译缓存.
+    每篇论文完成后调用 on_result(paper, 译文), 失败时译文为None"""
+
+    # 各翻译方式的限速: (每秒请求数, 允许的突发请求数)
+    RATE_LIMITS = {
+        "硅基流动API": (2.0, 4),
+        "有道翻译": (1.0, 2),
+    }
+
+    # 支持将多篇摘要打包进一次请求的翻译方式
+    PACKED_METHODS = ("硅基流动API",)
+
+    def __init__(self, papers, target_lang, method, api_key=None, model_id=None, max_workers=4, on_result=None):
+        self.papers = list(papers)
+        self.target_lang = target_lang
+        self.method = method
+        self.api_key = api_key
+        self.model_id = model_id
+        self.max_workers = max_workers
+        self.on_result = on_result
+        self.results = {}
+        self.done = 0
+        self.succeeded = 0
+        self._cancel_event = threading.Event()
+
+    @property
+    def cancelled(self):
+        return self._cancel_event.is_set()
+
+    def cancel(self):
+        self._cancel_event.set()
+
+    def run(self):
+        """执行批量翻译, 返回 {论文链接: 译文}"""
+        rate, burst = self.RATE_LIMITS.get(self.method, (1.0, 1))
+        limiter = TokenBucket(rate, burst)
+
+        # 先通过arXiv API批量补全未缓存的摘要, 避免各工作线程逐篇抓取论文页
+        try:
+            backfill_details(self.papers)
+        except Exception as e:
+            print(f"批量获取摘要失败: {e}")
+
+        executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        try:
+            if self.method in self.PACKED_METHODS:
+                futures = self.submit_packed(executor, limiter)
+            else:
+                futures = {executor.submit(self.translate_paper, paper, limiter): [paper]
+                           for paper in self.papers}
+            for future in as_completed(futures):
+                if self.cancelled:
+                    break
+                for paper, translation in zip(futures[future], future.result()):
+                    self.report(paper, translation)
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+        return self.results
+
+    def report(self, paper, translation):
+        self.done += 1
+        if translation is not None:
+            self.succeeded += 1
+            self.results[paper['url']] = translation
+        if self.on_result is not None:
+            self.on_result(paper, translation)
+
+    def load_abstract(self, paper):
+        if self.cancelled:
+            return None
+        try:
+            # API中缺失的论文才抓取论文页, 按 arxiv.org 的全局限速进行
+            abstract = get_paper_details(paper['url'], limiter=arxiv_page_limiter())['Abstract']
+        except Exception as e:
+            print(f"获取摘要失败 {paper['url']}: {e}")
+            return None
+        return None if abstract == "未找到摘要" else abstract
+
+    def translate_paper(self, paper, limiter):
+        abstract = self.load_abstract(paper)
+        if abstract is None:
+            return [None]
+        try:
+            translation, _ = translate_cached(
+                abstract, self.target_lang, self.method,
+                api_key=self.api_key, model_id=self.model_id, limiter=limiter
+            )
+        except Exception as e:
+            print(f"批量翻译失败 {paper['url']}: {e}")
+            return [None]
+        return [None if is_translation_error(translation) else translation]
+
+    def submit_packed(self, executor, limiter):
+        # 先并发获取摘要, 命中缓存的直接返回, 其余按上下文预算打包后每组发送一次请求
+        cache = get_translation_cache()
+        abstracts = list(executor.map(self.load_abstract, self.papers))
+        pending_papers = []
+        pending_texts = []
+        for paper, abstract in zip(self.papers, abstracts):
+            if abstract is None:
+                self.report(paper, None)
+                continue
+            cached = cache.get_translation(abstract, self.target_lang, self.method, self.model_id)
+            if cached is not None:
+                self.report(paper, cached)
+            else:
+                pending_papers.append(paper)
+                pending_texts.append(abstract)
+
+        futures = {}
+        for group in pack_texts(pending_texts):
+            texts = [pending_texts[i] for i in group]
+            future = executor.submit(self.translate_packed, texts, limiter)
+            futures[future] = [pending_papers[i] for i in group]
+        return futures
+
+    def translate_packed(self, texts, limiter):
+        if self.cancelled:
+            return [None] * len(texts)
+        cache = get_translation_cache()
+        results = []
+        translations = siliconflow_ts_batch(texts, self.target_lang, self.api_key, self.model_id,
+                                            limiter=limiter, stop_event=self._cancel_event)
+        for text, translation in zip(texts, translations):
+            if translation is None or is_translation_error(translation):
+                results.append(None)
+            else:
+                cache.set_translation(text, self.target_lang, self.method, self.model_id, translation)
+                results.append(translation)
+        return results
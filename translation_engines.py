@@ -0,0 +1,555 @@
+import abc
+import time
+import queue
+import asyncio
+import threading
+from collections import deque
+
+from siliconflow_ai import siliconflow_ts, siliconflow_ts_stream, siliconflow_ts_stream_async, format_error
+from viki import viki_translate_text, viki_translate_text_async
+import async_http
+
+# 有道翻译(60s API)的目标语言代码
+YOUDAO_LANG_CODES = {
+    "中文": "zh-CHS",
+    # "英文": "en",
+    "日文": "ja",
+    "中文繁体": "zh-CHT",
+}
+
+OFFLINE_PREFIX = "[离线占位]"
+
+# 对冲请求配置, 可通过 configure_hedging() 修改: 请求耗时超过所选引擎最近延迟的
+# 第 percentile 百分位数时, 向另一个引擎(或另一个模型)发出相同请求, 先返回者胜出
+hedge_config = {
+    "enabled": False,
+    "percentile": 95,
+    "min_samples": 5,  # 样本不足时使用 default_delay
+    "default_delay": 3.0,
+    "min_delay": 0.5,
+    "model_id": None,  # 没有其他可用引擎时, 同一引擎改用该模型发出对冲请求
+}
+
+# 以这些前缀开头的结果为翻译失败(或未真正翻译), 不写入缓存
+ERROR_PREFIXES = ("[翻译错误]", "[解析响应失败]", OFFLINE_PREFIX)
+
+
+def is_translation_error(translation):
+    return not translation or translation.startswith(ERROR_PREFIXES)
+
+
+class TranslationError(Exception):
+    """引擎翻译失败, message 为可直接显示的错误文本"""
+
+
+def _error_summary(error):
+    # 跳过 "[翻译错误]" 等标记行, 取第一行具体错误信息
+    lines = [line.strip() for line in str(error).splitlines() if line.strip()]
+    for line in lines:
+        if not line.startswith("["):
+            return line
+    return lines[0] if lines else type(error).__name__
+
+
+class EngineStats:
+    """单个翻译引擎的延迟和错误统计. 连续失败达到阈值后视为不可用, 冷却一段时间后再尝试"""
+
+    def __init__(self, window=100, max_consecutive_errors=3, cooldown=60.0):
+        self.max_consecutive_errors = max_consecutive_errors
+        self.cooldown = cooldown
+        self.latencies = deque(maxlen=window)
+        self.requests = 0
+        self.errors = 0
+        self.consecutive_errors = 0
+        self.last_error = ""
+        self.last_error_time = 0.0
+        # 对冲请求统计: 超时触发对冲的次数, 作为对冲方胜出的次数, 落后被取消的次数
+        self.hedged = 0
+        self.hedge_wins = 0
+        self.cancelled = 0
+        self._lock = threading.Lock()
+
+    def record_success(self, latency):
+        with self._lock:
+            self.requests += 1
+            self.consecutive_errors = 0
+            self.latencies.append(latency)
+
+    def record_failure(self, latency, error):
+        with self._lock:
+            self.requests += 1
+            self.errors += 1
+            self.consecutive_errors += 1
+            self.last_error = _error_summary(error)
+            self.last_error_time = time.time()
+            # 超时等失败同样计入延迟, 避免慢引擎因失败而显得很快
+            self.latencies.append(latency)
+
+    def record_cancelled(self, elapsed):
+        with self._lock:
+            self.requests += 1
+            self.cancelled += 1
+            # 被取消时的耗时是真实延迟的下限, 同样计入, 保留长尾
+            self.latencies.append(elapsed)
+
+    def record_hedge(self, won=False):
+        with self._lock:
+            if won:
+                self.hedge_wins += 1
+            else:
+                self.hedged += 1
+
+    def sample_count(self):
+        with self._lock:
+            return len(self.latencies)
+
+    def healthy(self):
+        with self._lock:
+            if self.consecutive_errors < self.max_consecutive_errors:
+                return True
+            return time.time() - self.last_error_time > self.cooldown
+
+    def mean_latency(self, default=5.0):
+        with self._lock:
+            if not self.latencies:
+                return default
+            return sum(self.latencies) / len(self.latencies)
+
+    def percentile(self, p, default=None):
+        """最近请求延迟的第 p 百分位数(秒), 样本不足时返回 default"""
+        with self._lock:
+            samples = sorted(self.latencies)
+        if not samples:
+            return default
+        index = min(len(samples) - 1, int(round(p / 100 * (len(samples) - 1))))
+        return samples[index]
+
+    def snapshot(self):
+        return {
+            'requests': self.requests,
+            'errors': self.errors,
+            'healthy': self.healthy(),
+            'mean_latency': self.mean_latency(default=None),
+            'p50': self.percentile(50),
+            'p95': self.percentile(95),
+            'hedged': self.hedged,
+            'hedge_wins': self.hedge_wins,
+            'cancelled': self.cancelled,
+            'last_error': self.last_error,
+        }
+
+
+class TranslationEngine(abc.ABC):
+    """翻译引擎接口. name 为界面与翻译缓存中使用的翻译方式名称;
+    translate 成功时返回译文, 失败时抛出异常(TranslationError 或网络异常)"""
+
+    name = None
+    requires_api_key = False
+    supports_stream = False
+    # 译文由 model_id 指定的模型生成(不同模型可作为对冲目标)
+    uses_model = False
+    # 只在其他引擎都不可用时使用
+    fallback_only = False
+
+    def __init__(self):
+        self.stats = EngineStats()
+
+    def usable(self, api_key=None):
+        return bool(api_key) or not self.requires_api_key
+
+    @abc.abstractmethod
+    def translate(self, text, target_lang, api_key=None, model_id=None, timeout=None):
+        """同步翻译, 返回译文"""
+
+    def stream(self, text, target_lang, api_key=None, model_id=None):
+        yield self.translate(text, target_lang, api_key=api_key, model_id=model_id)
+
+    async def translate_async(self, text, target_lang, api_key=None, model_id=None, timeout=None):
+        return await async_http.run_blocking(
+            lambda: self.translate(text, target_lang, api_key=api_key, model_id=model_id, timeout=timeout)
+        )
+
+    async def stream_async(self, text, target_lang, api_key=None, model_id=None):
+        yield await self.translate_async(text, target_lang, api_key=api_key, model_id=model_id)
+
+
+class SiliconFlowEngine(TranslationEngine):
+    name = "硅基流动API"
+    requires_api_key = True
+    supports_stream = True
+    uses_model = True
+
+    def translate(self, text, target_lang, api_key=None, model_id=None, timeout=None):
+        translation = siliconflow_ts(text, target_lang, api_key, model_id, timeout=timeout)
+        if is_translation_error(translation):
+            raise TranslationError(translation)
+        return translation
+
+    def stream(self, text, target_lang, api_key=None, model_id=None):
+        yield from siliconflow_ts_stream(text, target_lang, api_key, model_id)
+
+    async def translate_async(self, text, target_lang, api_key=None, model_id=None, timeout=None):
+        chunks = []
+        try:
+            async for chunk in self.stream_async(text, target_lang, api_key=api_key, model_id=model_id):
+                chunks.append(chunk)
+        except Exception as e:
+            raise TranslationError(format_error(e, text)) from e
+        return "".join(chunks)
+
+    async def stream_async(self, text, target_lang, api_key=None, model_id=None):
+        async for chunk in siliconflow_ts_stream_async(text, target_lang, api_key, model_id):
+            yield chunk
+
+
+class YoudaoEngine(TranslationEngine):
+    name = "有道翻译"
+
+    @staticmethod
+    def _check(translation, text):
+        if translation is None:
+            raise TranslationError(f"[翻译错误]\n\n错误信息: 有道翻译请求失败\n\n原始文本:\n{text}")
+        return translation
+
+    def translate(self, text, target_lang, api_key=None, model_id=None, timeout=None):
+        to_lang_code = YOUDAO_LANG_CODES.get(target_lang, "zh")
+        return self._check(viki_translate_text(text, to_lang=to_lang_code, timeout=timeout), text)
+
+    async def translate_async(self, text, target_lang, api_key=None, model_id=None, timeout=None):
+        to_lang_code = YOUDAO_LANG_CODES.get(target_lang, "zh")
+        return self._check(await viki_translate_text_async(text, to_lang=to_lang_code, timeout=timeout), text)
+
+
+class OfflineEngine(TranslationEngine):
+    """离线占位: 在线引擎全部不可用时原样返回原文并加以说明, 保证流程不中断. 结果不写入缓存"""
+
+    name = "离线占位"
+    fallback_only = True
+
+    def translate(self, text, target_lang, api_key=None, model_id=None, timeout=None):
+        return f"{OFFLINE_PREFIX} 在线翻译服务暂不可用, 以下为原文:\n\n{text}"
+
+    async def translate_async(self, text, target_lang, api_key=None, model_id=None, timeout=None):
+        return self.translate(text, target_lang)
+
+
+ENGINES = {}
+
+
+def register_engine(engine):
+    ENGINES[engine.name] = engine
+    return engine
+
+
+for _engine_class in (SiliconFlowEngine, YoudaoEngine, OfflineEngine):
+    register_engine(_engine_class())
+
+
+def get_engine(name):
+    engine = ENGINES.get(name)
+    if engine is None:
+        raise ValueError(f"不支持的翻译方式: {name}")
+    return engine
+
+
+def online_engine_names():
+    return tuple(name for name, engine in ENGINES.items() if not engine.fallback_only)
+
+
+def engine_stats():
+    return {name: engine.stats.snapshot() for name, engine in ENGINES.items()}
+
+
+def candidate_engines(preferred, api_key=None, exclude=()):
+    """故障转移顺序: 选定的引擎(可用时) -> 其余可用引擎按平均延迟从快到慢 -> 不可用的引擎 -> 离线占位"""
+    preferred_engine = get_engine(preferred)
+    online = [engine for engine in ENGINES.values()
+              if not engine.fallback_only and engine.usable(api_key) and engine.name not in exclude]
+    healthy = [engine for engine in online if engine.stats.healthy()]
+
+    ordered = [preferred_engine] if preferred_engine in healthy else []
+    ordered += sorted((engine for engine in healthy if engine is not preferred_engine),
+                      key=lambda engine: engine.stats.mean_latency())
+    ordered += [engine for engine in online if engine not in ordered]
+    ordered += [engine for engine in ENGINES.values() if engine.fallback_only]
+    return ordered
+
+
+def translate_with_failover(text, target_lang, method, api_key=None, model_id=None, timeout=None, exclude=()):
+    """依次尝试各引擎直到成功, 返回 (译文, 实际使用的引擎名称)"""
+    for engine in candidate_engines(method, api_key, exclude):
+        start = time.perf_counter()
+        try:
+            translation = engine.translate(text, target_lang, api_key=api_key, model_id=model_id, timeout=timeout)
+        except Exception as e:
+            engine.stats.record_failure(time.perf_counter() - start, e)
+            print(f"{engine.name} 翻译失败, 尝试其他引擎: {engine.stats.last_error}")
+            continue
+        engine.stats.record_success(time.perf_counter() - start)
+        return translation, engine.name
+    raise TranslationError(f"[翻译错误]\n\n错误信息: 没有可用的翻译引擎\n\n原始文本:\n{text}")
+
+
+async def translate_with_failover_async(text, target_lang, method, api_key=None, model_id=None,
+                                        timeout=None, exclude=()):
+    for engine in candidate_engines(method, api_key, exclude):
+        start = time.perf_counter()
+        try:
+            translation = await engine.translate_async(text, target_lang, api_key=api_key,
+                                                       model_id=model_id, timeout=timeout)
+        except Exception as e:
+            engine.stats.record_failure(time.perf_counter() - start, e)
+            print(f"{engine.name} 翻译失败, 尝试其他引擎: {engine.stats.last_error}")
+            continue
+        engine.stats.record_success(time.perf_counter() - start)
+        return translation, engine.name
+    raise TranslationError(f"[翻译错误]\n\n错误信息: 没有可用的翻译引擎\n\n原始文本:\n{text}")
+
+
+def stream_with_failover(text, target_lang, method, api_key=None, model_id=None, on_chunk=None, cancelled=None):
+    """选定引擎支持流式输出且可用时逐段回调 on_chunk, 失败后改用其他引擎整段翻译.
+    返回 (译文, 实际使用的引擎名称); cancelled() 为真时停止接收并返回已收到的部分"""
+    engine = get_engine(method)
+    if not (engine.supports_stream and engine.usable(api_key) and engine.stats.healthy()):
+        return translate_with_failover(text, target_lang, method, api_key=api_key, model_id=model_id)
+
+    start = time.perf_counter()
+    chunks = []
+    try:
+        for chunk in engine.stream(text, target_lang, api_key=api_key, model_id=model_id):
+            if cancelled is not None and cancelled():
+                break
+            chunks.append(chunk)
+            if on_chunk is not None:
+                on_chunk(chunk)
+    except Exception as e:
+        engine.stats.record_failure(time.perf_counter() - start, format_error(e, text))
+        print(f"{engine.name} 翻译失败, 尝试其他引擎: {engine.stats.last_error}")
+        return translate_with_failover(text, target_lang, method, api_key=api_key, model_id=model_id,
+                                       exclude=(engine.name,))
+    engine.stats.record_success(time.perf_counter() - start)
+    return "".join(chunks), engine.name
+
+
+async def stream_with_failover_async(text, target_lang, method, api_key=None, model_id=None, on_chunk=None):
+    """stream_with_failover 的异步版, 任务取消时连接随之关闭"""
+    engine = get_engine(method)
+    if not (engine.supports_stream and engine.usable(api_key) and engine.stats.healthy()):
+        return await translate_with_failover_async(text, target_lang, method, api_key=api_key, model_id=model_id)
+
+    start = time.perf_counter()
+    chunks = []
+    try:
+        async for chunk in engine.stream_async(text, target_lang, api_key=api_key, model_id=model_id):
+            chunks.append(chunk)
+            if on_chunk is not None:
+                on_chunk(chunk)
+    except Exception as e:
+        engine.stats.record_failure(time.perf_counter() - start, format_error(e, text))
+        print(f"{engine.name} 翻译失败, 尝试其他引擎: {engine.stats.last_error}")
+        return await translate_with_failover_async(text, target_lang, method, api_key=api_key,
+                                                   model_id=model_id, exclude=(engine.name,))
+    engine.stats.record_success(time.perf_counter() - start)
+    return "".join(chunks), engine.name
+
+
+def configure_hedging(**kwargs):
+    unknown = set(kwargs) - set(hedge_config)
+    if unknown:
+        raise KeyError(f"未知的对冲配置项: {', '.join(sorted(unknown))}")
+    hedge_config.update(kwargs)
+
+
+def hedge_delay(engine):
+    """触发对冲前等待的秒数: 该引擎最近延迟的第 percentile 百分位数"""
+    if engine.stats.sample_count() < hedge_config["min_samples"]:
+        return hedge_config["default_delay"]
+    return max(hedge_config["min_delay"], engine.stats.percentile(hedge_config["percentile"]))
+
+
+def hedge_target(primary, api_key=None, model_id=None):
+    """对冲请求的目标 (引擎, 模型ID): 优先选最快的其他可用引擎, 否则同一引擎换用配置的其他模型.
+    都没有时返回 None: 向同一引擎、同一模型重复发送相同的请求没有意义, 不发出对冲请求"""
+    for engine in candidate_engines(primary.name, api_key, exclude=(primary.name,)):
+        if not engine.fallback_only and engine.stats.healthy():
+            return engine, None
+    hedge_model = hedge_config["model_id"]
+    if primary.uses_model and hedge_model and hedge_model != model_id:
+        return primary, hedge_model
+    return None
+
+
+def format_engine_stats():
+    lines = []
+    for name, stats in engine_stats().items():
+        mean = "-" if stats['mean_latency'] is None else f"{stats['mean_latency']:.2f}s"
+        p95 = "-" if stats['p95'] is None else f"{stats['p95']:.2f}s"
+        line = (f"{name}: 请求 {stats['requests']} 次, 失败 {stats['errors']} 次, 平均 {mean}, P95 {p95}, "
+                f"触发对冲 {stats['hedged']} 次, 对冲胜出 {stats['hedge_wins']} 次, 被取消 {stats['cancelled']} 次")
+        if not stats['healthy']:
+            line += " (暂不可用)"
+        if stats['last_error']:
+            line += f"\n    最近错误: {stats['last_error']}"
+        lines.append(line)
+    return "\n".join(lines)
+
+
+class _HedgeAttempt(threading.Thread):
+    """对冲中的一路请求. 通过流式接口接收译文, 取消时在下一段数据到达前关闭连接"""
+
+    def __init__(self, engine, model_id, results, text, target_lang, api_key):
+        super().__init__(name=f"hedge-{engine.name}", daemon=True)
+        self.engine = engine
+        self.model_id = model_id
+        self.results = results
+        self.text = text
+        self.target_lang = target_lang
+        self.api_key = api_key
+        self.start_time = None
+        self.cancel_event = threading.Event()
+
+    def start(self):
+        self.start_time = time.perf_counter()
+        super().start()
+
+    def elapsed(self):
+        return time.perf_counter() - self.start_time
+
+    def cancel(self):
+        self.cancel_event.set()
+
+    def run(self):
+        chunks = []
+        stream = self.engine.stream(self.text, self.target_lang, api_key=self.api_key, model_id=self.model_id)
+        try:
+            for chunk in stream:
+                if self.cancel_event.is_set():
+                    return
+                chunks.append(chunk)
+        except Exception as e:
+            error = e if isinstance(e, TranslationError) else TranslationError(format_error(e, self.text))
+            self.results.put((self, None, error))
+            return
+        finally:
+            stream.close()
+
+        translation = "".join(chunks)
+        if is_translation_error(translation):
+            self.results.put((self, None, TranslationError(translation)))
+        else:
+            self.results.put((self, translation, None))
+
+
+def hedged_translate(text, target_lang, method, api_key=None, model_id=None, cancelled=None):
+    """对冲请求: 所选引擎超过 hedge_delay() 仍未返回时向 hedge_target() 发出相同请求,
+    采用先成功返回的结果并取消另一路. 两路都失败时按 translate_with_failover 继续尝试其他引擎.
+    没有可用的对冲目标时等同于 translate_with_failover. 返回 (译文, 实际使用的引擎名称, 实际使用的模型ID)"""
+    primary = get_engine(method)
+    target = hedge_target(primary, api_key, model_id)
+    if target is None or not (primary.usable(api_key) and primary.stats.healthy()):
+        return _with_model(translate_with_failover(text, target_lang, method, api_key=api_key, model_id=model_id),
+                           method, model_id)
+
+    results = queue.Queue()
+    first = _HedgeAttempt(primary, model_id, results, text, target_lang, api_key)
+    first.start()
+    attempts = [first]
+    pending = 1
+    deadline = time.monotonic() + hedge_delay(primary)
+
+    while pending:
+        hedging = len(attempts) == 1
+        timeout = max(0.0, deadline - time.monotonic()) if hedging else None
+        try:
+            attempt, translation, error = results.get(timeout=min(timeout, 0.1) if timeout is not None else 0.1)
+        except queue.Empty:
+            if cancelled is not None and cancelled():
+                for attempt in attempts:
+                    attempt.cancel()
+                return "", primary.name, model_id
+            if hedging and time.monotonic() >= deadline:
+                # 超过百分位延迟仍未返回, 发出对冲请求
+                primary.stats.record_hedge()
+                engine, hedge_model = target
+                second = _HedgeAttempt(engine, hedge_model, results, text, target_lang, api_key)
+                second.start()
+                attempts.append(second)
+                pending += 1
+            continue
+
+        pending -= 1
+        if error is not None:
+            attempt.engine.stats.record_failure(attempt.elapsed(), error)
+            print(f"{attempt.engine.name} 翻译失败: {attempt.engine.stats.last_error}")
+            if len(attempts) == 1:
+                # 对冲前就失败了, 直接走普通的故障转移
+                break
+            continue
+
+        attempt.engine.stats.record_success(attempt.elapsed())
+        if attempt is not first:
+            attempt.engine.stats.record_hedge(won=True)
+        for loser in attempts:
+            if loser is not attempt and loser.is_alive():
+                loser.cancel()
+                loser.engine.stats.record_cancelled(loser.elapsed())
+        return translation, attempt.engine.name, attempt.model_id
+
+    tried = tuple({attempt.engine.name for attempt in attempts})
+    return _with_model(translate_with_failover(text, target_lang, method, api_key=api_key, model_id=model_id,
+                                               exclude=tried), method, model_id)
+
+
+def _with_model(result, method, model_id):
+    # 故障转移到其他引擎时不使用所选的模型
+    translation, used_method = result
+    return translation, used_method, model_id if used_method == method else None
+
+
+async def hedged_translate_async(text, target_lang, method, api_key=None, model_id=None):
+    """hedged_translate 的异步版, 落后的一路请求直接取消任务, 连接随之关闭"""
+    primary = get_engine(method)
+    target = hedge_target(primary, api_key, model_id)
+    if target is None or not (primary.usable(api_key) and primary.stats.healthy()):
+        return _with_model(await translate_with_failover_async(text, target_lang, method, api_key=api_key,
+                                                               model_id=model_id), method, model_id)
+
+    def launch(engine, attempt_model_id):
+        task = asyncio.ensure_future(engine.translate_async(text, target_lang, api_key=api_key,
+                                                            model_id=attempt_model_id))
+        attempts[task] = (engine, attempt_model_id, time.perf_counter())
+        return task
+
+    attempts = {}
+    first = launch(primary, model_id)
+    done, pending = await asyncio.wait({first}, timeout=hedge_delay(primary))
+    if not done:
+        primary.stats.record_hedge()
+        pending.add(launch(*target))
+
+    try:
+        while done or pending:
+            for task in done:
+                engine, attempt_model_id, start = attempts[task]
+                error = task.exception()
+                if error is not None:
+                    engine.stats.record_failure(time.perf_counter() - start, error)
+                    print(f"{engine.name} 翻译失败: {engine.stats.last_error}")
+                    continue
+                engine.stats.record_success(time.perf_counter() - start)
+                if task is not first:
+                    engine.stats.record_hedge(won=True)
+                for loser in pending:
+                    loser_engine, _, loser_start = attempts[loser]
+                    loser_engine.stats.record_cancelled(time.perf_counter() - loser_start)
+                return task.result(), engine.name, attempt_model_id
+            if not pending:
+                break
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        for task in pending:
+            task.cancel()
+
+    tried = tuple({engine.name for engine, _, _ in attempts.values()})
+    return _with_model(await translate_with_failover_async(text, target_lang, method, api_key=api_key,
+                                                           model_id=model_id, exclude=tried), method, model_id)
@@ -1,10 +1,14 @@
 # API接口文档: https://docs.60s-api.viki.moe/254700383e0
-import requests
 import json
+import http_client
+import async_http
+from http_client import REQUEST_ERRORS
 
+API_URL = "https://60s.viki.moe/v2/fanyi"
 
-def viki_translate_text(text, from_lang="auto", to_lang="auto",encoding=None):
-    url = "https://60s.viki.moe/v2/fanyi"
+
+def viki_translate_text(text, from_lang="auto", to_lang="auto",encoding=None, timeout=None):
+    url = API_URL
     params = {
         "text": text,
         "from": from_lang,
@@ -13,11 +17,29 @@ def viki_translate_text(text, from_lang="auto", to_lang="auto",encoding=None):
     }
 
     try:
-        response = requests.get(url, params=params)
+        response = http_client.get(url, params=params, timeout=timeout)
         response.raise_for_status()
         js_on=response.json()
         return js_on["data"]["target"]["text"]
-    except requests.exceptions.RequestException as e:
+    except REQUEST_ERRORS as e:
+        print(f"请求出错: {e}")
+        return None
+
+
+async def viki_translate_text_async(text, from_lang="auto", to_lang="auto", encoding=None, timeout=None):
+    params = {
+        "text": text,
+        "from": from_lang,
+        "to": to_lang,
+    }
+    if encoding is not None:
+        params["encoding"] = encoding
+
+    try:
+        response = await async_http.get(API_URL, params=params, timeout=timeout)
+        response.raise_for_status()
+        return response.json()["data"]["target"]["text"]
+    except REQUEST_ERRORS as e:
         print(f"请求出错: {e}")
         return None
 
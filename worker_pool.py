@@ -0,0 +1,149 @@
+import os
+import abc
+import time
+import threading
+
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+
+# 共享线程池的默认线程数, 可通过环境变量修改
+DEFAULT_MAX_THREADS = int(os.environ.get("ARXIV_DAILY_MAX_THREADS", "8"))
+
+# 任务优先级: 数值越大越先执行
+PRIORITY_INTERACTIVE = 10  # 用户正在等待结果的任务, 如翻译当前摘要
+PRIORITY_FETCH = 5
+PRIORITY_BACKGROUND = 0  # 批量翻译等长时间运行的任务
+
+
+class TaskSignals(QObject):
+    finished = pyqtSignal()
+
+
+class _TaskMeta(type(QRunnable), abc.ABCMeta):
+    """QRunnable 使用 sip 的元类, 与 ABCMeta 合并后才能声明抽象方法"""
+
+
+class Task(QRunnable, metaclass=_TaskMeta):
+    """在共享线程池中运行的任务. QRunnable 不能定义信号, 信号放在 signals_class 创建的
+    QObject 上(在界面线程中创建, 工作线程发出的信号会排队到界面线程处理).
+    子类实现 run_task(), 需要支持取消时重写 cancel()"""
+
+    signals_class = TaskSignals
+
+    def __init__(self):
+        super().__init__()
+        # 由 TaskPool 持有引用直到任务结束, 不让线程池删除
+        self.setAutoDelete(False)
+        self.signals = self.signals_class()
+        self._done = threading.Event()
+
+    def run(self):
+        try:
+            self.run_task()
+        except Exception as e:
+            print(f"后台任务出错 {type(self).__name__}: {e}")
+        finally:
+            self._done.set()
+            self.signals.finished.emit()
+
+    @abc.abstractmethod
+    def run_task(self):
+        """在工作线程中执行任务, 结果通过 self.signals 发出"""
+
+    def cancel(self):
+        pass
+
+    def is_running(self):
+        """已提交且尚未结束(包括仍在排队)"""
+        return not self._done.is_set()
+
+    def wait(self, timeout=None):
+        return self._done.wait(timeout)
+
+
+class ChunkBuffer:
+    """将逐条产生的结果攒成批再通过信号发出: 满 max_items 条或距本批第一条超过 max_interval 秒时发出.
+    第一条结果立即发出, 界面尽快显示内容; 之后每批只发一次信号, 信号数量不随结果数量线性增长"""
+
+    def __init__(self, emit, max_items=200, max_interval=0.05):
+        self.emit = emit
+        self.max_items = max_items
+        self.max_interval = max_interval
+        self.emitted = 0
+        self._items = []
+        self._started = 0.0
+
+    def add(self, items):
+        if not items:
+            return
+        if not self._items:
+            self._started = time.monotonic()
+        self._items.extend(items)
+        if (self.emitted == 0 or len(self._items) >= self.max_items
+                or time.monotonic() - self._started >= self.max_interval):
+            self.flush()
+
+    def flush(self):
+        if self._items:
+            items, self._items = self._items, []
+            self.emitted += len(items)
+            self.emit(items)
+
+
+class ProgressThrottle:
+    """限制进度信号的频率: 距上次发出不足 min_interval 秒的更新直接丢弃(进度为100时总会发出)"""
+
+    def __init__(self, emit, min_interval=0.1):
+        self.emit = emit
+        self.min_interval = min_interval
+        self._last = None
+
+    def __call__(self, value, message):
+        now = time.monotonic()
+        if value < 100 and self._last is not None and now - self._last < self.min_interval:
+            return
+        self._last = now
+        self.emit(value, message)
+
+
+class TaskPool:
+    """对 QThreadPool 的封装: 复用线程, 按优先级调度, 关闭时取消并等待所有任务"""
+
+    def __init__(self, max_threads=DEFAULT_MAX_THREADS):
+        self._pool = QThreadPool()
+        self._pool.setMaxThreadCount(max_threads)
+        self._tasks = set()
+        self._lock = threading.Lock()
+
+    @property
+    def max_threads(self):
+        return self._pool.maxThreadCount()
+
+    def set_max_threads(self, count):
+        self._pool.setMaxThreadCount(max(1, count))
+
+    def start(self, task, priority=PRIORITY_FETCH):
+        with self._lock:
+            self._tasks.add(task)
+        task.signals.finished.connect(lambda: self._discard(task))
+        self._pool.start(task, priority)
+        return task
+
+    def _discard(self, task):
+        with self._lock:
+            self._tasks.discard(task)
+
+    def active_count(self):
+        with self._lock:
+            return sum(1 for task in self._tasks if task.is_running())
+
+    def shutdown(self, timeout_ms=5000):
+        """取消排队中的任务, 通知运行中的任务停止, 并等待它们结束"""
+        with self._lock:
+            tasks = list(self._tasks)
+        for task in tasks:
+            if self._pool.tryTake(task):
+                # 尚未开始的任务直接移出队列
+                task._done.set()
+            else:
+                task.cancel()
+        return self._pool.waitForDone(timeout_ms)